@@ -9,7 +9,7 @@ Usage (from Telegram):
 """
 
 import pandas as pd
-from strategy import get_smc_signal, get_pip_value, calculate_levels
+from strategy import OHLC, get_signal_fn, get_pip_value, calculate_levels
 
 
 def _walk_forward(df_l, df_h, pair, risk_pips=50, touch_trade=False,
@@ -24,10 +24,14 @@ def _walk_forward(df_l, df_h, pair, risk_pips=50, touch_trade=False,
     if len(df_l) < window_l or len(df_h) < 20:
         return
 
+    # Every window is a new prefix, so skip the in-memory memo; reruns over
+    # the same candles are served from SIGNAL_CACHE_DIR when it is set
+    signal_fn = get_signal_fn(pair, risk_pips, touch_trade, memo=False,
+                              disk_cache=True)
+    # Columns extracted once; each window is a view of its first i bars
+    ltf = OHLC.from_frame(df_l)
     for i in range(window_l, len(df_l), step):
-        chunk_l = df_l.iloc[:i].copy().reset_index(drop=True)
-        sig = get_smc_signal(chunk_l, df_h, pair,
-                             risk_pips=risk_pips, touch_trade=touch_trade)
+        sig = signal_fn(ltf.head(i), df_h)
         if sig:
             yield i, sig
 
@@ -33,6 +33,19 @@ NEWS_IMPACT = ["High", "Medium"]
 NEWS_CACHE_TTL = 3600  # seconds
 NEWS_BLACKOUT_MINUTES = 30
 
+# =====================
+# SIGNAL CACHE
+# =====================
+# Directory for the backtester's on-disk signal cache; unset = disabled.
+# Only walk-forward backtests use it (get_smc_signal(disk_cache=True)), so
+# reruns over the same candles skip the pipeline; the live scanner never
+# writes here. It has no eviction (one file per window and setting).
+# Entries are keyed on the candles and settings, not on the code:
+# clear the directory after changing the strategy or its config. Files are
+# unpickled, so the directory must be owned by the bot's user and not
+# group/world-writable; otherwise the cache is disabled.
+SIGNAL_CACHE_DIR = os.getenv("SIGNAL_CACHE_DIR")
+
 # =====================
 # DEFAULT USER SETTINGS (single source of truth)
 # =====================
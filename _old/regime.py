@@ -10,6 +10,7 @@ The scanner uses this to:
   - Weight signal quality by session killzone
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
 from config import logger
@@ -23,9 +24,9 @@ def compute_atr(df, period=14):
     if len(df) < period + 1:
         return None
 
-    highs = df['high'].values
-    lows = df['low'].values
-    closes = df['close'].values
+    highs = np.asarray(df['high'])
+    lows = np.asarray(df['low'])
+    closes = np.asarray(df['close'])
 
     tr_values = []
     for i in range(1, len(df)):
@@ -72,7 +73,7 @@ def compute_trend_strength(df, lookback=20):
     if len(df) < lookback + 1:
         return 0.0
 
-    closes = df['close'].values
+    closes = np.asarray(df['close'])
     recent = closes[-lookback:]
 
     net_move = abs(recent[-1] - recent[0])
@@ -211,9 +212,9 @@ def compute_adx(df, period=14):
     if len(df) < period * 2 + 1:
         return None
 
-    highs = df['high'].values
-    lows = df['low'].values
-    closes = df['close'].values
+    highs = np.asarray(df['high'])
+    lows = np.asarray(df['low'])
+    closes = np.asarray(df['close'])
 
     # True Range, +DM, -DM
     tr_list = []
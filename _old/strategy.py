@@ -1,13 +1,31 @@
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from functools import lru_cache, partial
+from typing import Optional
+
+import numpy as np
 import pandas as pd
-from config import HIGH_PIP_SYMBOLS, SKIP_VOLATILE_REGIME, ALWAYS_OPEN_KEYS, logger
+from numpy.lib.stride_tricks import sliding_window_view
+from config import (HIGH_PIP_SYMBOLS, SKIP_VOLATILE_REGIME, ALWAYS_OPEN_KEYS,
+                    SIGNAL_CACHE_DIR, logger)
 from regime import detect_regime, should_skip_regime
 
 
+@lru_cache(maxsize=256)
 def get_pip_value(pair):
     """Determine pip value multiplier for a given pair.
 
     Returns a multiplier so that (price_diff * pip_value) gives pips.
-    Grouped by typical price magnitude of the asset.
+    Grouped by typical price magnitude of the asset. Memoized per pair
+    string: the scanner and backtester look the same pairs up every pass.
     """
     clean = pair.upper()
     # Crypto — grouped by price magnitude
@@ -35,43 +53,226 @@ def get_pip_value(pair):
     return 10000  # standard forex
 
 
+@lru_cache(maxsize=None)
+def _pair_profile(pair, risk_pips):
+    """Per-pair constants of get_smc_signal(): (max_risk_price, is_always_open)."""
+    max_risk_price = risk_pips / get_pip_value(pair)
+    return max_risk_price, _always_open(pair)
+
+
+def _always_open(pair):
+    """True for crypto/synthetic pairs that trade around the clock."""
+    return any(k in pair.upper() for k in ALWAYS_OPEN_KEYS)
+
+
+_OHLC_COLUMNS = ['open', 'high', 'low', 'close']
+
+
+@dataclass(slots=True)
+class OHLC:
+    """Struct-of-arrays candle series: four aligned float64 columns.
+
+    Accepted in place of a DataFrame by the array-backed detectors
+    (find_zones, mark_freshness, get_fresh_zones, find_swing_points,
+    detect_bos, detect_inducement_swept) and by get_smc_signal(). Build it
+    once per series and pass it around instead of re-extracting columns from
+    the frame on every call.
+    """
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df):
+        """Columns of a DataFrame with open/high/low/close columns."""
+        return cls(*_ohlc_arrays(df))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Columns of a sequence (or (n, 4) array) of (open, high, low, close) rows."""
+        block = np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+        return cls(*np.ascontiguousarray(block.T))
+
+    def __len__(self):
+        return len(self.c)
+
+    def head(self, n):
+        """The first *n* bars, as views of this series' columns."""
+        return OHLC(self.o[:n], self.h[:n], self.l[:n], self.c[:n])
+
+    def __getitem__(self, column):
+        """Column by name ('open', 'high', 'low' or 'close'), as on a DataFrame."""
+        return (self.o, self.h, self.l, self.c)[_OHLC_COLUMNS.index(column)]
+
+
+def _ohlc_arrays(df):
+    """Extract (open, high, low, close) as float64 NumPy arrays.
+
+    The four columns come out of a single ``to_numpy`` call: for a frame that
+    is already one float64 block (open/high/low/close only) this is a
+    zero-copy view, and each returned column is a view into it. Frames with
+    other columns or dtypes still work but pay one copy per call. An OHLC
+    struct hands back its own columns.
+    """
+    if isinstance(df, OHLC):
+        return df.o, df.h, df.l, df.c
+    if list(df.columns) != _OHLC_COLUMNS:
+        df = df[_OHLC_COLUMNS]
+    block = df.to_numpy(dtype=np.float64, copy=False)
+    return tuple(block.T)
+
+
+_SWING_WINDOW = (-23, -3)
+
+
+def _scan(o, h, l, c, swing_window=_SWING_WINDOW):
+    """Derive every per-bar column the detectors need in one vectorized pass.
+
+    The detectors read their answers out of this struct-of-arrays instead of
+    each re-walking the OHLC bars. All arrays are aligned with the input bars:
+
+      open/high/low/close   raw columns
+      body, body_ratio      |close - open| and body / (high - low), 0 on flat bars
+      bull                  +1 for an up-close bar, -1 otherwise
+      body_top/body_bottom  max/min(open, close)
+      swing_high/swing_low  high.max()/low.min() over the find_swing_points()
+                            window ending at each bar (NaN until it is full)
+      gap_up/gap_down       FVG gap ending at each bar: low - high two bars
+                            back (up) and low two bars back - high (down);
+                            NaN for the first two bars
+      later_low/later_high  lowest low / highest high of the bars *after*
+                            each bar (+inf / -inf on the last bar)
+    """
+    start, end = swing_window
+    body = np.abs(c - o)
+    total_range = h - l
+    body_ratio = np.divide(body, total_range, out=np.zeros_like(body),
+                           where=total_range > 0)
+    swing_high, swing_low = _swing_extremes(h, l, start, end)
+    gap_up = np.full_like(h, np.nan)
+    gap_down = np.full_like(h, np.nan)
+    gap_up[2:] = l[2:] - h[:-2]
+    gap_down[2:] = l[:-2] - h[2:]
+    later_low = np.minimum.accumulate(np.append(l[1:], np.inf)[::-1])[::-1]
+    later_high = np.maximum.accumulate(np.append(h[1:], -np.inf)[::-1])[::-1]
+    return {
+        "open": o, "high": h, "low": l, "close": c,
+        "body": body, "body_ratio": body_ratio,
+        "bull": np.where(c > o, 1, -1),
+        "body_top": np.maximum(o, c), "body_bottom": np.minimum(o, c),
+        "swing_high": swing_high, "swing_low": swing_low,
+        "swing_window": swing_window,
+        "gap_up": gap_up, "gap_down": gap_down,
+        "later_low": later_low, "later_high": later_high,
+    }
+
+
+def _swing_extremes(h, l, start, end):
+    """Per-bar high.max() / low.min() over the window [t+1+start, t+end].
+
+    That is the find_swing_points() slice of a frame ending at bar t. Every
+    window is a strided view over the column (no copies), and each max/min is a
+    single reduction over all of them. Bars whose window starts before the first
+    bar are NaN.
+    """
+    n = len(h)
+    swing_high = np.full(n, np.nan)
+    swing_low = np.full(n, np.nan)
+    width = end - start
+    first = -1 - start          # first bar whose window is complete
+    if width > 0 and n > first:
+        count = n - first
+        swing_high[first:] = sliding_window_view(h, width)[:count].max(axis=-1)
+        swing_low[first:] = sliding_window_view(l, width)[:count].min(axis=-1)
+    return swing_high, swing_low
+
+
+def _get_scan(df, scan=None, swing_window=_SWING_WINDOW):
+    """Return *scan* if the caller already built it for *df*, else scan *df*.
+
+    Nothing is cached here: callers that run several detectors on one frame
+    (get_smc_signal) build the scan once and pass it down.
+    """
+    if scan is not None:
+        return scan
+    return _scan(*_ohlc_arrays(df), swing_window=swing_window)
+
+
+def _ohlc(scan):
+    """The (open, high, low, close) columns of a scan."""
+    return scan["open"], scan["high"], scan["low"], scan["close"]
+
+
 # =====================
 # Gap 1: Body-Based Fresh Zone Detection
 # =====================
 
-def _has_displacement(df, bar_index, direction, atr, min_mult=1.0):
-    """Check if the candle after zone formation shows institutional displacement.
+@dataclass(slots=True)
+class Zone:
+    """A supply/demand zone found by find_zones() or flipped by mark_freshness().
+
+    Item access (z["fresh"], z.get("displacement"), "miss" in z) mirrors the
+    attributes so code written against the old zone dicts keeps working;
+    to_dict() gives a real dict at the API boundary. FLIP zones carry
+    no displacement check and no age.
+    """
+    type: str
+    direction: str
+    top: float
+    bottom: float
+    bar_index: int
+    fresh: bool = True
+    miss: bool = False
+    displacement: bool = False
+    age: Optional[int] = None
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def to_dict(self):
+        """Plain-dict copy of the zone, for callers that serialize or persist it."""
+        return {f: getattr(self, f) for f in self.__slots__}
+
+
+def _displacement_flags(scan, bar_index, demand, atr, min_mult=1.0):
+    """Check if the candles after each zone's formation show institutional displacement.
 
     A valid zone requires price to move aggressively *away* from the zone,
     proving institutional orders were placed there. The displacement candle
-    must have a body >= min_mult * ATR.
+    must have a body >= min_mult * ATR and a body ratio >= 0.6, and one of
+    the (up to) 3 candles after the zone must qualify.
 
-    Returns True if displacement is confirmed.
+    *bar_index* / *demand* are per-zone arrays; returns a boolean array that
+    is True where displacement is confirmed (or there is not enough data to
+    judge — that doesn't block the zone).
     """
     check_start = bar_index + 2  # zone spans bar_index and bar_index+1
-    if check_start >= len(df) or atr is None or atr <= 0:
-        return True  # insufficient data, don't block
-
-    # Check up to 3 candles after zone for displacement
-    for j in range(check_start, min(check_start + 3, len(df))):
-        c = df.iloc[j]
-        body = abs(c['close'] - c['open'])
-        total_range = c['high'] - c['low']
-        if total_range <= 0:
-            continue
-        body_ratio = body / total_range
-
-        if body >= min_mult * atr and body_ratio >= 0.6:
-            # Confirm direction: displacement must move AWAY from zone
-            is_bullish_candle = c['close'] > c['open']
-            if direction == "demand" and is_bullish_candle:
-                return True  # bullish displacement away from demand = valid
-            if direction == "supply" and not is_bullish_candle:
-                return True  # bearish displacement away from supply = valid
-    return False
-
-
-def find_zones(df, lookback=40, atr=None):
+    if atr is None or atr <= 0:
+        return np.ones(len(bar_index), dtype=bool)
+
+    strong = (scan["body"] >= min_mult * atr) & (scan["body_ratio"] >= 0.6)
+    bull = scan["bull"] > 0
+    # Displacement must move AWAY from the zone: bullish off demand,
+    # bearish off supply. Window j covers candles j..j+2 (padded past the end).
+    pad = np.zeros(3, dtype=bool)
+    away_up = sliding_window_view(np.concatenate([strong & bull, pad]), 3)
+    away_down = sliding_window_view(np.concatenate([strong & ~bull, pad]), 3)
+    confirmed = np.where(demand, away_up[check_start].any(axis=1),
+                         away_down[check_start].any(axis=1))
+    return confirmed | (check_start >= len(bull))
+
+
+def find_zones(df, lookback=40, atr=None, scan=None):
     """Scan the last *lookback* candles and return MSNR-style zones.
 
     Zone types:
@@ -85,64 +286,158 @@ def find_zones(df, lookback=40, atr=None):
       - Displacement validation: zone must show institutional displacement
       - Recency decay: zones older than 30 bars are deprioritized
 
-    Returns a list of zone dicts:
+    Returns a list of Zone records:
         {type, direction, top, bottom, bar_index, fresh, miss, displacement, age}
     """
     if len(df) < 2:
         return []
+    return _find_zones_core(_get_scan(df, scan), lookback, atr).to_list()
+
+
+class ZoneType(IntEnum):
+    """Integer codes of the zone types, as stored in Zones.kind.
 
-    start = max(0, len(df) - lookback)
-    zones = []
+    Zone records keep the type name ("A", "V", "OC", "FLIP") at the API.
+    Internal passes compare these codes, not strings.
+    """
+    A = 0
+    V = 1
+    OC = 2
+    FLIP = 3
+
+
+_ZONE_NAMES = tuple(t.name for t in ZoneType)
+# Type assumed for zone dicts that carry none (the generic two-candle gap)
+_DEFAULT_ZONE_TYPE = "OC"
+
+
+@dataclass(slots=True)
+class Zones:
+    """Columnar zone table: one array per Zone field, one row per zone.
+
+    *kind* holds ZoneType codes and *demand* is True for demand zones, so the
+    numeric passes (freshness, filtering) stay on plain arrays. An *age* of
+    -1 means "no age" (FLIP zones). to_list() materializes Zone records at
+    the API boundary.
+    """
+    kind: np.ndarray
+    demand: np.ndarray
+    top: np.ndarray
+    bottom: np.ndarray
+    bar_index: np.ndarray
+    fresh: np.ndarray
+    miss: np.ndarray
+    displacement: np.ndarray
+    age: np.ndarray
+
+    def __len__(self):
+        return len(self.kind)
+
+    @classmethod
+    def from_list(cls, zones):
+        """Table of a list of Zone records (or zone dicts).
+
+        Dicts without a "type" (hand-built zones) get _DEFAULT_ZONE_TYPE;
+        mark_freshness() only reads their geometry and freshness.
+        """
+        return cls(
+            np.array([ZoneType[z.get("type", _DEFAULT_ZONE_TYPE)] for z in zones],
+                     dtype=np.int8),
+            np.array([z["direction"] == "demand" for z in zones], dtype=bool),
+            np.array([z["top"] for z in zones], dtype=np.float64),
+            np.array([z["bottom"] for z in zones], dtype=np.float64),
+            np.array([z["bar_index"] for z in zones], dtype=np.int64),
+            np.array([z["fresh"] for z in zones], dtype=bool),
+            np.array([z.get("miss", False) for z in zones], dtype=bool),
+            np.array([z.get("displacement", False) for z in zones], dtype=bool),
+            np.array([_age_code(z.get("age")) for z in zones], dtype=np.int64),
+        )
+
+    def to_list(self):
+        """Zone records for every row."""
+        return [
+            Zone(_ZONE_NAMES[k], "demand" if d else "supply", t, b, i,
+                 fresh=f, miss=m, displacement=disp, age=None if age < 0 else age)
+            for k, d, t, b, i, f, m, disp, age in zip(
+                self.kind.tolist(), self.demand.tolist(), self.top.tolist(),
+                self.bottom.tolist(), self.bar_index.tolist(), self.fresh.tolist(),
+                self.miss.tolist(), self.displacement.tolist(), self.age.tolist())
+        ]
+
+    def sorted_opposing(self, direction):
+        """Ascending levels of the fresh *direction* zones that face an entry:
+        supply bottoms (BULL targets) or demand tops (BEAR targets)."""
+        if direction == "supply":
+            return np.sort(self.bottom[self.fresh & ~self.demand])
+        return np.sort(self.top[self.fresh & self.demand])
+
+    def ranked(self, direction):
+        """Row indices of the fresh *direction* zones, strongest first.
+
+        Strength order: FLIP > displacement > MISS > recency. Ties keep
+        table order.
+        """
+        rows = np.flatnonzero(self.fresh & (self.demand == (direction == "demand")))
+        # lexsort: last key is primary; False sorts before True
+        order = np.lexsort((-self.bar_index[rows], ~self.miss[rows],
+                            ~self.displacement[rows],
+                            self.kind[rows] != ZoneType.FLIP))
+        return rows[order]
+
+    def take(self, rows):
+        """New table of the given *rows*, in that order."""
+        return Zones(*(getattr(self, f)[rows] for f in self.__slots__))
+
+    def concat(self, other):
+        """New table with *other*'s rows after this one's."""
+        return Zones(*(np.concatenate([getattr(self, f), getattr(other, f)])
+                       for f in self.__slots__))
+
+
+def _age_code(age):
+    return -1 if age is None else age
+
+
+def _find_zones_core(scan, lookback, atr):
+    """Numeric core of find_zones(): a Zones table built from a _scan() of the frame.
+
+    Classifies every candle pair in the lookback with array masks; only the
+    pairs that qualify become rows.
+    """
+    o, c = scan["open"], scan["close"]
+    n = len(c)
+    start = max(0, n - lookback)
 
     # Minimum zone width: 5% of ATR to filter noise
     min_width = atr * 0.05 if atr and atr > 0 else 0
 
-    for i in range(start, len(df) - 1):
-        c1 = df.iloc[i]
-        c2 = df.iloc[i + 1]
-        c1_bull = c1['close'] > c1['open']
-        c2_bull = c2['close'] > c2['open']
-
-        zone_info = None
-
-        # A-Level: bullish then bearish → supply/resistance zone
-        if c1_bull and not c2_bull:
-            top = max(c1['close'], c2['open'])
-            bottom = min(c1['close'], c2['open'])
-            if top - bottom > min_width:
-                zone_info = {"type": "A", "direction": "supply",
-                             "top": top, "bottom": bottom}
-
-        # V-Level: bearish then bullish → demand/support zone
-        elif not c1_bull and c2_bull:
-            top = max(c1['close'], c2['open'])
-            bottom = min(c1['close'], c2['open'])
-            if top - bottom > min_width:
-                zone_info = {"type": "V", "direction": "demand",
-                             "top": top, "bottom": bottom}
-
-        # OC-Gap: same direction, gap between c1.close and c2.open
-        elif c1_bull == c2_bull:
-            gap_top = max(c1['close'], c2['open'])
-            gap_bottom = min(c1['close'], c2['open'])
-            if gap_top - gap_bottom > min_width:
-                direction = "supply" if not c1_bull else "demand"
-                zone_info = {"type": "OC", "direction": direction,
-                             "top": gap_top, "bottom": gap_bottom}
-
-        if zone_info is not None:
-            has_disp = _has_displacement(df, i, zone_info["direction"], atr)
-            age = len(df) - 1 - i
-            zone_info.update({
-                "bar_index": i, "fresh": True, "miss": False,
-                "displacement": has_disp, "age": age,
-            })
-            zones.append(zone_info)
-
-    return zones
+    # Candle pairs (i, i+1) for every i in the lookback
+    i = np.arange(start, n - 1)
+    bull = scan["bull"] > 0
+    c1_bull, c2_bull = bull[i], bull[i + 1]
+    top = np.maximum(c[i], o[i + 1])
+    bottom = np.minimum(c[i], o[i + 1])
+
+    # A-Level: bullish then bearish → supply/resistance zone
+    a_level = c1_bull & ~c2_bull
+    # V-Level: bearish then bullish → demand/support zone
+    v_level = ~c1_bull & c2_bull
+    # OC-Gap: same direction, gap between c1.close and c2.open;
+    # its direction follows the candles
+    demand = np.where(a_level | v_level, v_level, c1_bull)
+    kind = np.where(a_level, ZoneType.A,
+                    np.where(v_level, ZoneType.V, ZoneType.OC)).astype(np.int8)
+
+    hit = np.flatnonzero(top - bottom > min_width)
+    i, demand = i[hit], demand[hit]
+    return Zones(
+        kind[hit], demand, top[hit], bottom[hit], i,
+        fresh=np.ones(hit.size, dtype=bool), miss=np.zeros(hit.size, dtype=bool),
+        displacement=_displacement_flags(scan, i, demand, atr), age=n - 1 - i,
+    )
 
 
-def mark_freshness(zones, df):
+def mark_freshness(zones, df, scan=None):
     """Update freshness on each zone by checking subsequent candle wicks.
 
     A zone becomes unfresh (fresh=False) if any candle after its formation
@@ -157,91 +452,101 @@ def mark_freshness(zones, df):
     SBR/RBS: If a candle body closes *through* a zone (not just wick), the
     zone is broken and becomes fresh in the opposite direction, tagged FLIP.
     """
-    new_zones = []
-
-    for z in zones:
-        formation = z["bar_index"] + 1  # zone forms across bar_index and bar_index+1
-        start_check = formation + 1
-        miss_window = 3
-        miss_count = 0
-
-        # Mitigation buffer: 0.1% of zone midpoint
-        zone_mid = (z["top"] + z["bottom"]) / 2
-        buffer = zone_mid * 0.001
-
-        buffered_top = z["top"] + buffer
-        buffered_bottom = z["bottom"] - buffer
-
-        # Exclude current candle (last bar) from freshness check —
-        # the current candle is the potential entry candle. If it's the
-        # first touch of a fresh zone, we WANT to trade it, not kill it.
-        freshness_end = len(df) - 1
-
-        for j in range(start_check, freshness_end):
-            candle = df.iloc[j]
-
-            # SBR/RBS: body closes through the zone → broken, flip direction
-            body_bottom = min(candle['open'], candle['close'])
-            body_top = max(candle['open'], candle['close'])
-
-            if z["direction"] == "demand" and body_bottom < z["bottom"]:
-                # Bearish body closed below demand zone → broken → becomes supply
-                z["fresh"] = False
-                new_zones.append({
-                    "type": "FLIP", "direction": "supply",
-                    "top": z["top"], "bottom": z["bottom"],
-                    "bar_index": j, "fresh": True, "miss": False,
-                })
-                break
-            if z["direction"] == "supply" and body_top > z["top"]:
-                # Bullish body closed above supply zone → broken → becomes demand
-                z["fresh"] = False
-                new_zones.append({
-                    "type": "FLIP", "direction": "demand",
-                    "top": z["top"], "bottom": z["bottom"],
-                    "bar_index": j, "fresh": True, "miss": False,
-                })
-                break
-
-            # Check wick touch WITH mitigation buffer
-            wick_touches = (candle['low'] <= buffered_top
-                           and candle['high'] >= buffered_bottom)
-
-            if wick_touches:
-                z["fresh"] = False
-                break
-
-            if j - start_check < miss_window:
-                miss_count += 1
-
-        if z["fresh"] and miss_count >= miss_window:
-            z["miss"] = True
-
-    # Add SBR/RBS flipped zones and check their freshness
-    if new_zones:
-        zones.extend(new_zones)
-        freshness_end = len(df) - 1  # exclude current candle
-        for nz in new_zones:
-            start_check = nz["bar_index"] + 1
-            miss_count = 0
-            nz_width = nz["top"] - nz["bottom"]
-            nz_mid = (nz["top"] + nz["bottom"]) / 2
-            buf = max(nz_width * 0.05, nz_mid * 0.0002)
-            for j in range(start_check, freshness_end):
-                candle = df.iloc[j]
-                wick_touches = (candle['low'] <= nz["top"] + buf
-                                and candle['high'] >= nz["bottom"] - buf)
-                if wick_touches:
-                    nz["fresh"] = False
-                    break
-                if j - start_check < 3:
-                    miss_count += 1
-            if nz["fresh"] and miss_count >= 3:
-                nz["miss"] = True
-
+    if not zones:
+        return zones
+    table = Zones.from_list(zones)
+    was_fresh, was_miss = table.fresh.copy(), table.miss.copy()
+    flips = _mark_freshness_core(table, _get_scan(df, scan))
+    for row in np.flatnonzero(was_fresh & ~table.fresh).tolist():
+        zones[row]["fresh"] = False
+    for row in np.flatnonzero(~was_miss & table.miss).tolist():
+        zones[row]["miss"] = True
+    zones.extend(flips.to_list())
     return zones
 
 
+def _mark_freshness_core(zones, scan):
+    """Numeric core of mark_freshness() on a Zones table and a _scan() of the frame.
+
+    Updates *zones*.fresh / .miss in place and returns the SBR/RBS FLIP zones
+    as a new table. All zones are checked against the completed bars at once
+    as a (zones x bars) matrix; each zone's outcome is decided by its first
+    body break or wick touch, and the MISS check only needs "no event at
+    all" over at least 3 bars after formation. The matrix only spans bars
+    from the earliest zone's first check bar on, so its width follows the
+    zone lookback rather than the frame length.
+    """
+    h, l = scan["high"], scan["low"]
+    miss_window = 3
+
+    # Exclude current candle (last bar) from freshness check —
+    # the current candle is the potential entry candle. If it's the
+    # first touch of a fresh zone, we WANT to trade it, not kill it.
+    freshness_end = len(h) - 1
+
+    top, bottom, demand = zones.top, zones.bottom, zones.demand
+    # zone forms across bar_index and bar_index+1; check from the bar after
+    start_check = zones.bar_index + 2
+    # Columns start at the first bar any zone can react to (keeping at
+    # least one column so the argmax below is defined)
+    first_bar = min(int(start_check.min()), freshness_end - 1) if len(zones) else 0
+    first_bar = max(first_bar, 0)
+    bars = slice(first_bar, freshness_end)
+    bar_pos = np.arange(first_bar, freshness_end)
+    after = bar_pos[None, :] >= start_check[:, None]
+
+    # Mitigation buffer: 0.1% of zone midpoint
+    buffer = (top + bottom) / 2 * 0.001
+    buffered_top = (top + buffer)[:, None]
+    buffered_bottom = (bottom - buffer)[:, None]
+
+    # SBR/RBS: body closes through the zone → broken, flip direction
+    broken = after & np.where(demand[:, None],
+                              scan["body_bottom"][None, bars] < bottom[:, None],
+                              scan["body_top"][None, bars] > top[:, None])
+    # Wick touch WITH mitigation buffer
+    touched = after & (l[None, bars] <= buffered_top) & (h[None, bars] >= buffered_bottom)
+
+    event = broken | touched
+    has_event = event.any(axis=1)
+    first = event.argmax(axis=1)  # column of the first event
+
+    zones.miss |= ~has_event & zones.fresh & (freshness_end - start_check >= miss_window)
+    zones.fresh &= ~has_event
+
+    # Demand broken → becomes supply; supply broken → becomes demand
+    flipped = np.flatnonzero(has_event & broken[np.arange(len(zones)), first])
+    n_flips = flipped.size
+    flips = Zones(
+        np.full(n_flips, ZoneType.FLIP, dtype=np.int8), ~demand[flipped],
+        top[flipped], bottom[flipped], (first[flipped] + first_bar).astype(np.int64),
+        fresh=np.ones(n_flips, dtype=bool), miss=np.zeros(n_flips, dtype=bool),
+        displacement=np.zeros(n_flips, dtype=bool),
+        age=np.full(n_flips, -1, dtype=np.int64),
+    )
+
+    # Check the flipped zones' own freshness
+    if n_flips:
+        top, bottom = flips.top, flips.bottom
+        start_check = flips.bar_index + 1
+        buf = np.maximum((top - bottom) * 0.05, (top + bottom) / 2 * 0.0002)
+        touched = ((bar_pos[None, :] >= start_check[:, None])
+                   & (l[None, bars] <= (top + buf)[:, None])
+                   & (h[None, bars] >= (bottom - buf)[:, None])).any(axis=1)
+        flips.fresh = ~touched
+        flips.miss = ~touched & (freshness_end - start_check >= miss_window)
+    return flips
+
+
+def _marked_zone_table(df, lookback, atr, scan=None):
+    """Zones table of find_zones() + mark_freshness(), FLIP rows appended."""
+    if len(df) < 2:
+        return Zones.from_list([])
+    scan = _get_scan(df, scan)
+    table = _find_zones_core(scan, lookback, atr)
+    return table.concat(_mark_freshness_core(table, scan))
+
+
 def get_fresh_zones(df, direction, lookback=40, atr=None):
     """Return fresh zones matching *direction* ('supply' or 'demand').
 
@@ -252,24 +557,21 @@ def get_fresh_zones(df, direction, lookback=40, atr=None):
 
     Sorted by strength: FLIP > displacement > MISS > recency.
     """
-    zones = find_zones(df, lookback, atr=atr)
-    zones = mark_freshness(zones, df)
-    filtered = [z for z in zones if z["fresh"] and z["direction"] == direction]
-    # Prioritize: FLIP > displacement > MISS > recency
-    filtered.sort(key=lambda z: (
-        -int(z["type"] == "FLIP"),
-        -int(z.get("displacement", False)),
-        -int(z["miss"]),
-        -z["bar_index"],
-    ))
-    return filtered
+    table = _marked_zone_table(df, lookback, atr)
+    return table.take(table.ranked(direction)).to_list()
+
+
+def _best_fresh_zone(table, direction):
+    """Strongest fresh *direction* zone of a Zones table as a Zone, or None."""
+    rows = table.ranked(direction)[:1]
+    return table.take(rows).to_list()[0] if rows.size else None
 
 
 # =====================
 # Arrival Physics Filter (Gap 1 - Sniper)
 # =====================
 
-def analyze_arrival(df, zone_price, direction, lookback=3):
+def analyze_arrival(df, zone_price, direction, lookback=3, scan=None):
     """Check if price arrived at zone with compression (good) or momentum (bad).
 
     Directionally aware: only rejects momentum candles moving AGAINST the zone.
@@ -280,50 +582,44 @@ def analyze_arrival(df, zone_price, direction, lookback=3):
         True if arrival is compressed (safe to trade).
         False if adverse momentum arrival detected (invalidated).
     """
-    if len(df) < lookback + 1:
+    if len(df) < lookback + 1 or direction not in ("demand", "supply"):
         return True  # insufficient data, don't block
 
+    scan = _get_scan(df, scan)
+    return _arrival_core(scan["body"], scan["bull"], direction == "demand", lookback)
+
+
+def _arrival_core(body, bull, demand, lookback):
+    """Numeric core of analyze_arrival() over the body / bull columns of a scan."""
     # Average body size over last 50 (or available) candles
-    body_window = min(50, len(df))
-    bodies = (df['close'].iloc[-body_window:] - df['open'].iloc[-body_window:]).abs()
-    avg_body = bodies.mean()
+    avg_body = body[-50:].mean()
 
     if avg_body <= 0:
         return True  # flat market, no momentum
 
-    # Check last N candles for adverse Marubozu (body > 2.5x average)
-    recent = df.iloc[-lookback:]
-    for _, c in recent.iterrows():
-        body = abs(c['close'] - c['open'])
-        if body <= 2.5 * avg_body:
-            continue
-
-        is_bullish = c['close'] > c['open']
-
-        # Only reject if momentum is AGAINST the zone direction
-        # Demand zone (BUY): reject bearish momentum (selling into the zone)
-        # Supply zone (SELL): reject bullish momentum (buying into the zone)
-        if direction == "demand" and not is_bullish:
-            return False  # bearish momentum into demand = bad
-        if direction == "supply" and is_bullish:
-            return False  # bullish momentum into supply = bad
-
-    return True  # compression arrival — safe
+    # Adverse Marubozu in the last N candles (body > 2.5x average), counted
+    # only if the momentum is AGAINST the zone direction:
+    # Demand zone (BUY): bearish momentum (selling into the zone) is bad
+    # Supply zone (SELL): bullish momentum (buying into the zone) is bad
+    recent = slice(len(body) - lookback, None)
+    against = bull[recent] < 0 if demand else bull[recent] > 0
+    return not (against & (body[recent] > 2.5 * avg_body)).any()
 
 
 # =====================
 # Existing helpers (kept)
 # =====================
 
-def find_swing_points(df_l, start=-23, end=-3):
+def find_swing_points(df_l, start=-23, end=-3, scan=None):
     """Find swing high and swing low from a price range."""
     if len(df_l) < abs(start):
         return None, None
-    segment = df_l.iloc[start:end]
-    return segment['high'].max(), segment['low'].min()
+    if scan is None or scan["swing_window"] != (start, end):
+        scan = _get_scan(df_l, swing_window=(start, end))
+    return scan["swing_high"][-1], scan["swing_low"][-1]
 
 
-def detect_bos(df_l, swing_high, swing_low, lookback=10, atr=None):
+def detect_bos(df_l, swing_high, swing_low, lookback=10, atr=None, scan=None):
     """Detect Break of Structure with displacement validation.
 
     Returns (bullish_bos, bearish_bos, bull_sweep, bear_sweep).
@@ -337,46 +633,33 @@ def detect_bos(df_l, swing_high, swing_low, lookback=10, atr=None):
     if len(df_l) < lookback:
         return False, False, False, False
 
-    segment = df_l.iloc[-lookback:]
-
-    bullish_bos = False
-    bearish_bos = False
-    bull_sweep = False
-    bear_sweep = False
-
     # Minimum body size for BOS = 25% of ATR (reject noise breaks)
     min_bos_body = atr * 0.25 if atr and atr > 0 else 0
 
-    for idx in range(len(segment)):
-        c = segment.iloc[idx]
-        body = abs(c['close'] - c['open'])
-        total_range = c['high'] - c['low']
-        body_ratio = body / total_range if total_range > 0 else 0
+    return _detect_bos_core(_get_scan(df_l, scan), lookback,
+                            swing_high, swing_low, min_bos_body)
 
-        # Bullish BOS: close above swing high with displacement
-        if c['close'] > swing_high and body >= min_bos_body and body_ratio >= 0.5:
-            bullish_bos = True
 
-        # Bearish BOS: close below swing low with displacement
-        if c['close'] < swing_low and body >= min_bos_body and body_ratio >= 0.5:
-            bearish_bos = True
+def _detect_bos_core(scan, lookback, swing_high, swing_low, min_bos_body):
+    """Numeric core of detect_bos() over the last *lookback* bars of a scan."""
+    tail = slice(-lookback, None)
+    h, l, c = scan["high"][tail], scan["low"][tail], scan["close"][tail]
+    displaced = ((scan["body"][tail] >= min_bos_body)
+                 & (scan["body_ratio"][tail] >= 0.5))
 
-        # Wick sweeps (regardless of body size)
-        if c['high'] > swing_high and c['close'] <= swing_high:
-            bull_sweep = True
-        if c['low'] < swing_low and c['close'] >= swing_low:
-            bear_sweep = True
+    # BOS: close beyond the swing level with displacement
+    bullish_bos = bool((displaced & (c > swing_high)).any())
+    bearish_bos = bool((displaced & (c < swing_low)).any())
 
-    # Sweep is only valid if there was NO legitimate BOS
-    if bullish_bos:
-        bull_sweep = False
-    if bearish_bos:
-        bear_sweep = False
+    # Wick sweeps (regardless of body size) — only valid if there was NO
+    # legitimate BOS in the same direction
+    bull_sweep = not bullish_bos and bool(((h > swing_high) & (c <= swing_high)).any())
+    bear_sweep = not bearish_bos and bool(((l < swing_low) & (c >= swing_low)).any())
 
     return bullish_bos, bearish_bos, bull_sweep, bear_sweep
 
 
-def detect_fvg(df_l, lookback=15, atr=None):
+def detect_fvg(df_l, lookback=15, atr=None, scan=None):
     """Detect Fair Value Gap (imbalance) within the last *lookback* candles.
 
     Scans backwards to find the most recent unmitigated FVG.
@@ -390,44 +673,33 @@ def detect_fvg(df_l, lookback=15, atr=None):
         return None
 
     min_gap = atr * 0.3 if atr and atr > 0 else 0
-    start = max(0, len(df_l) - lookback)
-
-    # Scan from most recent backwards
-    for i in range(len(df_l) - 1, start + 1, -1):
-        c1 = df_l.iloc[i - 2]
-        c3 = df_l.iloc[i]
-
-        # Bullish FVG: c3.low > c1.high (gap up)
-        if c3['low'] > c1['high'] and (c3['low'] - c1['high']) >= min_gap:
-            fvg_top = c3['low']
-            fvg_bottom = c1['high']
-            # Check mitigation: any subsequent candle's low dipped into the gap?
-            mitigated = False
-            for j in range(i + 1, len(df_l)):
-                if df_l.iloc[j]['low'] <= fvg_top:
-                    mitigated = True
-                    break
-            if not mitigated:
-                return {"type": "BULL_FVG", "top": fvg_top,
-                        "bottom": fvg_bottom, "bar_index": i - 2}
-
-        # Bearish FVG: c3.high < c1.low (gap down)
-        if c3['high'] < c1['low'] and (c1['low'] - c3['high']) >= min_gap:
-            fvg_top = c1['low']
-            fvg_bottom = c3['high']
-            mitigated = False
-            for j in range(i + 1, len(df_l)):
-                if df_l.iloc[j]['high'] >= fvg_bottom:
-                    mitigated = True
-                    break
-            if not mitigated:
-                return {"type": "BEAR_FVG", "top": fvg_top,
-                        "bottom": fvg_bottom, "bar_index": i - 2}
-
-    return None
+    scan = _get_scan(df_l, scan)
+    h, l = scan["high"], scan["low"]
+    n = len(h)
+    start = max(0, n - lookback)
+
+    # Third candle of each candidate pattern, i.e. c1 = i - 2, c3 = i
+    window = slice(start + 2, n)
+    gap_up, gap_down = scan["gap_up"][window], scan["gap_down"][window]
+    # Bullish FVG: c3.low > c1.high (gap up), unmitigated if no later low
+    # dipped back into the gap (to c3.low)
+    bull = (gap_up > 0) & (gap_up >= min_gap) & (scan["later_low"][window] > l[window])
+    # Bearish FVG: c3.high < c1.low (gap down), unmitigated if no later high
+    # reached back into the gap (to c3.high)
+    bear = (gap_down > 0) & (gap_down >= min_gap) & (scan["later_high"][window] < h[window])
+
+    # Most recent pattern wins; a bar can't hold both a gap up and a gap down
+    hits = np.flatnonzero(bull | bear)
+    if not hits.size:
+        return None
+    k = int(hits[-1])
+    i = start + 2 + k
+    if bull[k]:
+        return {"type": "BULL_FVG", "top": l[i], "bottom": h[i - 2], "bar_index": i - 2}
+    return {"type": "BEAR_FVG", "top": l[i - 2], "bottom": h[i], "bar_index": i - 2}
 
 
-def compute_volume_proxy(df, zone, lookback=5):
+def compute_volume_proxy(df, zone, lookback=5, scan=None):
     """Estimate institutional participation at a zone using candle structure.
 
     Without real volume data, we use body-to-wick ratio and candle size as
@@ -446,28 +718,22 @@ def compute_volume_proxy(df, zone, lookback=5):
     # Look at candles near the zone formation
     start = max(0, zone["bar_index"] - 1)
     end = min(len(df), zone["bar_index"] + lookback + 1)
-    nearby = df.iloc[start:end]
-
-    if nearby.empty:
+    scan = _get_scan(df, scan)
+    total_range = (scan["high"] - scan["low"])[start:end]
+    ranged = total_range > 0
+    body = scan["body"][start:end][ranged]
+    if not body.size:
         return 0.5
 
-    scores = []
-    for _, c in nearby.iterrows():
-        body = abs(c['close'] - c['open'])
-        total_range = c['high'] - c['low']
-        if total_range <= 0:
-            continue
-
-        # Body-to-range ratio: higher = more conviction
-        body_ratio = body / total_range
-
-        # Size relative to average: bigger candles = more volume
-        avg_body = (df['close'] - df['open']).abs().mean()
-        size_score = min(body / avg_body, 2.0) / 2.0 if avg_body > 0 else 0.5
+    # Body-to-range ratio: higher = more conviction
+    body_ratio = body / total_range[ranged]
 
-        scores.append((body_ratio * 0.6 + size_score * 0.4))
+    # Size relative to average: bigger candles = more volume
+    avg_body = scan["body"].mean()
+    size_score = np.minimum(body / avg_body, 2.0) / 2.0 if avg_body > 0 else 0.5
 
-    return round(sum(scores) / len(scores), 3) if scores else 0.5
+    scores = (body_ratio * 0.6 + size_score * 0.4).tolist()
+    return round(sum(scores) / len(scores), 3)
 
 
 def calculate_levels(sig_type, entry, sl_anchor, max_risk_price, tp_target,
@@ -484,29 +750,24 @@ def calculate_levels(sig_type, entry, sl_anchor, max_risk_price, tp_target,
     TP3 = HTF extreme or 1:3 RR (runner)
     """
     effective_max_risk = max_risk_price * sl_multiplier
-
-    if sig_type == "BUY":
-        raw_sl = sl_anchor
-        sl = entry - effective_max_risk if (entry - raw_sl) > effective_max_risk else raw_sl
-        risk = abs(entry - sl)
-        tp1 = entry + risk          # 1:1
-        tp2 = tp_target             # opposing zone
-        tp3_rr = entry + risk * 3   # 1:3
-        tp3 = max(tp3_rr, htf_extreme) if htf_extreme and htf_extreme > entry else tp3_rr
-        # Ensure TP ordering: TP1 < TP2 < TP3
-        tp2 = max(tp2, tp1)
-        tp3 = max(tp3, tp2)
-    else:
-        raw_sl = sl_anchor
-        sl = entry + effective_max_risk if (raw_sl - entry) > effective_max_risk else raw_sl
-        risk = abs(sl - entry)
-        tp1 = entry - risk          # 1:1
-        tp2 = tp_target             # opposing zone
-        tp3_rr = entry - risk * 3   # 1:3
-        tp3 = min(tp3_rr, htf_extreme) if htf_extreme and htf_extreme < entry else tp3_rr
-        # Ensure TP ordering: TP1 > TP2 > TP3
-        tp2 = min(tp2, tp1)
-        tp3 = min(tp3, tp2)
+    # +1 for BUY, -1 for SELL: every "beyond entry" comparison and offset
+    # below is signed by it, so both sides share one straight-line path.
+    sign = 1.0 if sig_type == "BUY" else -1.0
+
+    # SL at the structural anchor, capped at the max risk from entry
+    capped_sl = entry - sign * effective_max_risk
+    sl = capped_sl if sign * (entry - sl_anchor) > effective_max_risk else sl_anchor
+    risk = abs(entry - sl)
+    tp1 = entry + sign * risk       # 1:1
+    tp2 = tp_target                 # opposing zone
+    tp3 = entry + sign * risk * 3   # 1:3, or the HTF extreme if further out
+    if htf_extreme and sign * (htf_extreme - tp3) > 0:
+        tp3 = htf_extreme
+    # Ensure TP ordering away from entry: TP1 <= TP2 <= TP3 (BUY), mirrored for SELL
+    if sign * (tp1 - tp2) > 0:
+        tp2 = tp1
+    if sign * (tp2 - tp3) > 0:
+        tp3 = tp2
 
     return {"sl": sl, "tp": tp2, "tp1": tp1, "tp2": tp2, "tp3": tp3}
 
@@ -519,29 +780,31 @@ def detect_bias(df_h, lookback=20):
     """Legacy bias detection (momentum check). Kept for fallback."""
     if len(df_h) < lookback + 1:
         return None
-    if df_h['close'].iloc[-1] > df_h['close'].iloc[-lookback]:
+    close = _ohlc_arrays(df_h)[3]
+    if close[-1] > close[-lookback]:
         return "BULL"
     return "BEAR"
 
 
-def _htf_rejection(df_h, zones, direction, candles_to_check=3):
+def _htf_rejection(htf, zones, direction, candles_to_check=3):
     """Check if a recent HTF candle rejected off a fresh zone.
 
+    *htf* is the (open, high, low, close) arrays of the HTF frame.
+
     For a bullish rejection (demand zone): wick enters zone but body closes
     above it.  For bearish rejection (supply zone): wick enters zone but
     body closes below it.
     """
-    start = max(0, len(df_h) - candles_to_check)
-    for i in range(len(df_h) - 1, start - 1, -1):
-        c = df_h.iloc[i]
+    # Newest candle first, as plain floats
+    recent = [col[-candles_to_check:][::-1].tolist() for col in htf]
+    for o, h, l, c in zip(*recent):
+        body_top = max(o, c)
+        body_bottom = min(o, c)
         for z in zones:
-            wick_enters = c['low'] <= z['top'] and c['high'] >= z['bottom']
+            wick_enters = l <= z['top'] and h >= z['bottom']
             if not wick_enters:
                 continue
 
-            body_top = max(c['open'], c['close'])
-            body_bottom = min(c['open'], c['close'])
-
             if direction == "demand" and body_bottom >= z['bottom']:
                 # Wick dipped into demand but body closed above → bullish rejection
                 return z
@@ -551,6 +814,75 @@ def _htf_rejection(df_h, zones, direction, candles_to_check=3):
     return None
 
 
+@dataclass(slots=True)
+class ZoneIndex:
+    """Opposing-zone levels of a fresh zone set, presorted for binary search.
+
+    supply_bottoms: bottoms of the supply zones (BULL targets / roadblocks)
+    demand_tops:    tops of the demand zones (BEAR targets / roadblocks)
+
+    Build it once per fresh zone set with from_zones(); it is a snapshot, so
+    rebuild after mark_freshness() changes which zones are fresh.
+    """
+    supply_bottoms: np.ndarray
+    demand_tops: np.ndarray
+
+    @classmethod
+    def from_zones(cls, fresh_zones):
+        """Index of a list of fresh zones, or of the fresh rows of a Zones table."""
+        if isinstance(fresh_zones, Zones):
+            return cls(fresh_zones.sorted_opposing("supply"),
+                       fresh_zones.sorted_opposing("demand"))
+        supply = [z["bottom"] for z in fresh_zones if z["direction"] == "supply"]
+        demand = [z["top"] for z in fresh_zones if z["direction"] == "demand"]
+        return cls(np.sort(np.array(supply, dtype=float)),
+                   np.sort(np.array(demand, dtype=float)))
+
+    def nearest_above(self, price):
+        """Lowest supply bottom strictly above *price*, or None."""
+        pos = np.searchsorted(self.supply_bottoms, price, side="right")
+        return float(self.supply_bottoms[pos]) if pos < self.supply_bottoms.size else None
+
+    def nearest_below(self, price):
+        """Highest demand top strictly below *price*, or None."""
+        pos = np.searchsorted(self.demand_tops, price, side="left")
+        return float(self.demand_tops[pos - 1]) if pos > 0 else None
+
+
+def analyze_opposing(fresh_zones, bias, entry_price, fallback, tp_hint=None):
+    """Find the nearest opposing fresh zone for both the TP level and the roadblock flag.
+
+    BULL → nearest fresh supply zone's bottom above entry.
+    BEAR → nearest fresh demand zone's top below entry.
+    The roadblock flag is True if an opposing zone sits between entry and the
+    target (tp_hint, or the TP found here) within 30% of that range.
+
+    *fresh_zones* is a list of fresh zones, a Zones table (its fresh rows are
+    used) or a prebuilt ZoneIndex.
+    Returns (tp, roadblock). tp is *fallback* if no opposing zone is found.
+    """
+    index = fresh_zones if isinstance(fresh_zones, ZoneIndex) \
+        else ZoneIndex.from_zones(fresh_zones)
+    if bias == "BULL":
+        nearest = index.nearest_above(entry_price)
+        dist = None if nearest is None else nearest - entry_price
+    else:
+        nearest = index.nearest_below(entry_price)
+        dist = None if nearest is None else entry_price - nearest
+    tp = fallback if nearest is None else nearest
+
+    target = tp_hint if tp_hint is not None else tp
+    if target is None or dist is None:
+        return tp, False
+    total_range = abs(target - entry_price)
+    if total_range <= 0:
+        return tp, False
+    # Blockers must sit strictly between entry and target. Both conditions
+    # only get harder as the distance grows, so the nearest zone decides.
+    span = target - entry_price if bias == "BULL" else entry_price - target
+    return tp, bool(dist < span and dist / total_range <= 0.3)
+
+
 def _opposing_zone_tp(fresh_zones, bias, entry_price, fallback):
     """Find TP from the nearest opposing fresh HTF zone.
 
@@ -558,16 +890,7 @@ def _opposing_zone_tp(fresh_zones, bias, entry_price, fallback):
     BEAR → nearest fresh demand zone's top below entry.
     Falls back to HTF max/min if no opposing zone found.
     """
-    if bias == "BULL":
-        candidates = [z for z in fresh_zones
-                      if z["direction"] == "supply" and z["bottom"] > entry_price]
-        candidates.sort(key=lambda z: z["bottom"])
-        return candidates[0]["bottom"] if candidates else fallback
-    else:
-        candidates = [z for z in fresh_zones
-                      if z["direction"] == "demand" and z["top"] < entry_price]
-        candidates.sort(key=lambda z: -z["top"])
-        return candidates[0]["top"] if candidates else fallback
+    return analyze_opposing(fresh_zones, bias, entry_price, fallback)[0]
 
 
 def _check_roadblock(fresh_zones, bias, entry_price, tp_target):
@@ -575,30 +898,8 @@ def _check_roadblock(fresh_zones, bias, entry_price, tp_target):
 
     Returns True if a roadblock is near, meaning limited room to breathe.
     """
-    total_range = abs(tp_target - entry_price)
-    if total_range <= 0:
-        return False
-
-    if bias == "BULL":
-        # Look for supply zones between entry and TP
-        blockers = [z for z in fresh_zones
-                    if z["direction"] == "supply"
-                    and z["bottom"] > entry_price
-                    and z["bottom"] < tp_target]
-        for z in blockers:
-            dist = z["bottom"] - entry_price
-            if dist / total_range <= 0.3:
-                return True
-    else:
-        blockers = [z for z in fresh_zones
-                    if z["direction"] == "demand"
-                    and z["top"] < entry_price
-                    and z["top"] > tp_target]
-        for z in blockers:
-            dist = entry_price - z["top"]
-            if dist / total_range <= 0.3:
-                return True
-    return False
+    return analyze_opposing(fresh_zones, bias, entry_price, tp_target,
+                            tp_hint=tp_target)[1]
 
 
 def check_roadblocks(entry_price, direction, fresh_zones, risk_distance):
@@ -611,76 +912,135 @@ def check_roadblocks(entry_price, direction, fresh_zones, risk_distance):
     if risk_distance <= 0:
         return True
 
-    if direction == "BUY":
-        blockers = [z for z in fresh_zones
-                    if z["direction"] == "supply" and z["bottom"] > entry_price]
-        if not blockers:
-            return True  # no opposing zones = clear sky
-        blockers.sort(key=lambda z: z["bottom"])
-        nearest_dist = blockers[0]["bottom"] - entry_price
+    bias = "BULL" if direction == "BUY" else "BEAR"
+    nearest, _ = analyze_opposing(fresh_zones, bias, entry_price, None)
+    return _rr_clear(nearest, entry_price, risk_distance)
+
+
+def _rr_clear(nearest, entry_price, risk_distance):
+    """True if the nearest opposing level leaves room for 1:2 RR (or none exists)."""
+    if nearest is None:
+        return True  # no opposing zones = clear sky
+    return bool(abs(nearest - entry_price) >= 2.0 * risk_distance)
+
+
+@dataclass(slots=True)
+class _HTFContext:
+    """The df_h-only half of detect_storyline(), cached per HTF frame.
+
+    Its Zone records are shared between calls; the storyline hands out
+    copies.
+    """
+    fresh: list
+    demand: list
+    supply: list
+    opposing: ZoneIndex
+    high: float
+    low: float
+    bull_zone: Optional[Zone]
+    bear_zone: Optional[Zone]
+
+
+def _build_htf_context(df_h):
+    """HTF zones, range and rejection zones for *df_h*."""
+    # Compute HTF ATR for zone width filtering
+    from regime import compute_atr
+    table = _marked_zone_table(df_h, lookback=40, atr=compute_atr(df_h))
+    fresh = [z for z in table.to_list() if z["fresh"]]
+    demand = [z for z in fresh if z["direction"] == "demand"]
+    supply = [z for z in fresh if z["direction"] == "supply"]
+    htf = _ohlc_arrays(df_h)
+    return _HTFContext(
+        fresh, demand, supply, ZoneIndex.from_zones(table),
+        htf[1].max(), htf[2].min(),
+        _htf_rejection(htf, demand, "demand"),
+        _htf_rejection(htf, supply, "supply"),
+    )
+
+
+def _htf_context(df_h):
+    """_build_htf_context(), cached on the HTF candles' values.
+
+    A scanner or backtest evaluating many LTF frames against one HTF frame
+    builds it once. Keyed on a digest of the OHLC values (not the frame's
+    identity), so a frame edited in place gets a new context.
+    """
+    key = _frame_digest(df_h)
+    ctx = _htf_cache.get(key)
+    if ctx is None:
+        ctx = _htf_cache[key] = _build_htf_context(df_h)
+        if len(_htf_cache) > _HTF_CACHE_SIZE:
+            _htf_cache.popitem(last=False)
     else:
-        blockers = [z for z in fresh_zones
-                    if z["direction"] == "demand" and z["top"] < entry_price]
-        if not blockers:
-            return True
-        blockers.sort(key=lambda z: -z["top"])
-        nearest_dist = entry_price - blockers[0]["top"]
+        _htf_cache.move_to_end(key)
+    return ctx
+
+
+# _htf_context() results keyed on _frame_digest(df_h), least recently used
+# dropped first.
+_htf_cache = OrderedDict()
+_HTF_CACHE_SIZE = 64
 
-    return nearest_dist >= 2.0 * risk_distance
+
+def _frame_digest(df):
+    """16-byte BLAKE2b digest of *df*'s length and OHLC values.
+
+    Hashes the columns in place (no bytes copy); values, not identity, so
+    equal candles share cache entries and in-place edits never hit stale ones.
+    """
+    digest = hashlib.blake2b(len(df).to_bytes(8, "little"), digest_size=16)
+    for col in _ohlc_arrays(df):
+        digest.update(np.ascontiguousarray(col))
+    return digest.digest()
 
 
-def detect_storyline(df_h, df_l):
+def detect_storyline(df_h, df_l, ltf_scan=None, htf_context=None):
     """Detect HTF rejection + LTF breakout confirmation.
 
     Returns {bias, htf_zone, tp_target, confirmed, roadblock_near} or None.
     TP targets the nearest opposing fresh HTF zone (same-TF rule).
+
+    *ltf_scan* and *htf_context* let get_smc_signal() share the _scan() of
+    df_l and the _htf_context() of df_h it already built.
     """
     if len(df_h) < 10 or len(df_l) < 23:
         return None
 
-    # Compute HTF ATR for zone width filtering
-    from regime import compute_atr
-    htf_atr = compute_atr(df_h)
-    htf_zones = find_zones(df_h, lookback=40, atr=htf_atr)
-    htf_zones = mark_freshness(htf_zones, df_h)
-    fresh_htf = [z for z in htf_zones if z["fresh"]]
-
-    demand_zones = [z for z in fresh_htf if z["direction"] == "demand"]
-    supply_zones = [z for z in fresh_htf if z["direction"] == "supply"]
+    htf = htf_context or _build_htf_context(df_h)
+    # Both the rejection and the BOS fallback below need fresh HTF zones:
+    # without any, skip the LTF work entirely.
+    if not htf.fresh:
+        return None
 
-    current_price = df_l['close'].iloc[-1]
+    ltf = _get_scan(df_l, ltf_scan)
+    current_price = ltf["close"][-1]
+    swing_high, swing_low = find_swing_points(df_l, scan=ltf)
 
     # Check for bullish rejection (off demand)
-    bull_zone = _htf_rejection(df_h, demand_zones, "demand")
-    if bull_zone:
-        tp = _opposing_zone_tp(fresh_htf, "BULL", current_price, df_h['high'].max())
-        roadblock = _check_roadblock(fresh_htf, "BULL", current_price, tp)
+    if htf.bull_zone:
+        tp, roadblock = analyze_opposing(htf.opposing, "BULL", current_price, htf.high)
 
-        swing_high, swing_low = find_swing_points(df_l)
         confirmed = False
         if swing_high is not None:
-            result = detect_bos(df_l, swing_high, swing_low)
+            result = detect_bos(df_l, swing_high, swing_low, scan=ltf)
             bull_bos = result[0]
             confirmed = bool(bull_bos)
         return {
-            "bias": "BULL", "htf_zone": bull_zone, "tp_target": tp,
+            "bias": "BULL", "htf_zone": replace(htf.bull_zone), "tp_target": tp,
             "confirmed": confirmed, "roadblock_near": roadblock,
         }
 
     # Check for bearish rejection (off supply)
-    bear_zone = _htf_rejection(df_h, supply_zones, "supply")
-    if bear_zone:
-        tp = _opposing_zone_tp(fresh_htf, "BEAR", current_price, df_h['low'].min())
-        roadblock = _check_roadblock(fresh_htf, "BEAR", current_price, tp)
+    if htf.bear_zone:
+        tp, roadblock = analyze_opposing(htf.opposing, "BEAR", current_price, htf.low)
 
-        swing_high, swing_low = find_swing_points(df_l)
         confirmed = False
         if swing_high is not None:
-            result = detect_bos(df_l, swing_high, swing_low)
+            result = detect_bos(df_l, swing_high, swing_low, scan=ltf)
             bear_bos = result[1]
             confirmed = bool(bear_bos)
         return {
-            "bias": "BEAR", "htf_zone": bear_zone, "tp_target": tp,
+            "bias": "BEAR", "htf_zone": replace(htf.bear_zone), "tp_target": tp,
             "confirmed": confirmed, "roadblock_near": roadblock,
         }
 
@@ -700,28 +1060,25 @@ def detect_storyline(df_h, df_l):
         k in detect_storyline._pair for k in ALWAYS_OPEN_KEYS)
 
     # Use LTF BOS to determine bias direction when HTF zones exist but no rejection
-    if fresh_htf:
-        swing_high, swing_low = find_swing_points(df_l)
+    if htf.fresh:
         if swing_high is not None:
-            bull_bos, bear_bos, _, _ = detect_bos(df_l, swing_high, swing_low)
+            bull_bos, bear_bos, _, _ = detect_bos(df_l, swing_high, swing_low, scan=ltf)
 
-            if bull_bos and demand_zones:
+            if bull_bos and htf.demand:
                 # LTF confirms bullish + HTF demand zones exist = structural bull bias
-                best_demand = max(demand_zones, key=lambda z: z["bar_index"])
-                tp = _opposing_zone_tp(fresh_htf, "BULL", current_price, df_h['high'].max())
-                roadblock = _check_roadblock(fresh_htf, "BULL", current_price, tp)
+                best_demand = max(htf.demand, key=lambda z: z["bar_index"])
+                tp, roadblock = analyze_opposing(htf.opposing, "BULL", current_price, htf.high)
                 return {
-                    "bias": "BULL", "htf_zone": best_demand, "tp_target": tp,
+                    "bias": "BULL", "htf_zone": replace(best_demand), "tp_target": tp,
                     "confirmed": True, "roadblock_near": roadblock,
                 }
 
-            if bear_bos and supply_zones:
+            if bear_bos and htf.supply:
                 # LTF confirms bearish + HTF supply zones exist = structural bear bias
-                best_supply = max(supply_zones, key=lambda z: z["bar_index"])
-                tp = _opposing_zone_tp(fresh_htf, "BEAR", current_price, df_h['low'].min())
-                roadblock = _check_roadblock(fresh_htf, "BEAR", current_price, tp)
+                best_supply = max(htf.supply, key=lambda z: z["bar_index"])
+                tp, roadblock = analyze_opposing(htf.opposing, "BEAR", current_price, htf.low)
                 return {
-                    "bias": "BEAR", "htf_zone": best_supply, "tp_target": tp,
+                    "bias": "BEAR", "htf_zone": replace(best_supply), "tp_target": tp,
                     "confirmed": True, "roadblock_near": roadblock,
                 }
 
@@ -732,7 +1089,7 @@ def detect_storyline(df_h, df_l):
 # Retest Confirmation (Gap 3 kept + enhanced)
 # =====================
 
-def detect_engulfing(df, zone, lookback=10, atr=None):
+def detect_engulfing(df, zone, lookback=10, atr=None, scan=None):
     """Detect an engulfing pattern at or near the given zone.
 
     Requires:
@@ -748,42 +1105,28 @@ def detect_engulfing(df, zone, lookback=10, atr=None):
 
     min_body = atr * 0.2 if atr and atr > 0 else 0
 
-    start = max(0, len(df) - lookback)
-    for i in range(start + 1, len(df)):
-        prev = df.iloc[i - 1]
-        curr = df.iloc[i]
-
-        prev_body_top = max(prev['open'], prev['close'])
-        prev_body_bottom = min(prev['open'], prev['close'])
-        curr_body_top = max(curr['open'], curr['close'])
-        curr_body_bottom = min(curr['open'], curr['close'])
-
-        curr_body = curr_body_top - curr_body_bottom
-        curr_range = curr['high'] - curr['low']
-        body_ratio = curr_body / curr_range if curr_range > 0 else 0
-
-        # Skip weak candles
-        if curr_body < min_body or body_ratio < 0.4:
-            continue
-
-        # Bullish engulfing at demand zone
-        if (curr['close'] > curr['open']
-                and curr_body_bottom <= prev_body_bottom
-                and curr_body_top >= prev_body_top
-                and curr['low'] <= zone['top']):
-            return i
-
-        # Bearish engulfing at supply zone
-        if (curr['close'] < curr['open']
-                and curr_body_bottom <= prev_body_bottom
-                and curr_body_top >= prev_body_top
-                and curr['high'] >= zone['bottom']):
-            return i
+    scan = _get_scan(df, scan)
+    o, h, l, c = _ohlc(scan)
+    n = len(c)
+    start = max(0, n - lookback)
+    # Each candle in the window against the one before it
+    curr, prev = slice(start + 1, n), slice(start, n - 1)
+    body_top, body_bottom = scan["body_top"], scan["body_bottom"]
 
-    return None
+    # Skip weak candles
+    strong = (scan["body"][curr] >= min_body) & (scan["body_ratio"][curr] >= 0.4)
+    engulfs = ((body_bottom[curr] <= body_bottom[prev])
+               & (body_top[curr] >= body_top[prev]))
+    # Bullish engulfing at demand zone / bearish engulfing at supply zone
+    at_zone = (((c[curr] > o[curr]) & (l[curr] <= zone['top']))
+               | ((c[curr] < o[curr]) & (h[curr] >= zone['bottom'])))
+
+    hits = np.flatnonzero(strong & engulfs & at_zone)
+    return start + 1 + int(hits[0]) if hits.size else None
 
 
-def detect_inducement_swept(df, swing_high, swing_low, direction, lookback=15):
+def detect_inducement_swept(df, swing_high, swing_low, direction, lookback=15,
+                            scan=None):
     """Check if liquidity was swept before the current move.
 
     For BUY:  a wick dipped below swing_low but the body (close) closed back
@@ -793,26 +1136,30 @@ def detect_inducement_swept(df, swing_high, swing_low, direction, lookback=15):
     Returns dict {swept: bool, wick_level: float} so SL can be placed
     below/above the sweep wick for maximum protection.
     """
-    result = {"swept": False, "wick_level": None}
+    if len(df) < lookback or direction not in ("BUY", "SELL"):
+        return {"swept": False, "wick_level": None}
 
-    if len(df) < lookback:
-        return result
+    scan = _get_scan(df, scan)
+    tail = slice(len(scan["high"]) - lookback, None)  # lookback=0 scans no bars
+    swept, wick_level = _inducement_core(
+        scan["high"][tail], scan["low"][tail], scan["body_top"][tail],
+        scan["body_bottom"][tail], swing_high, swing_low, direction == "BUY")
+    return {"swept": swept, "wick_level": wick_level}
 
-    start = max(0, len(df) - lookback)
 
-    for i in range(start, len(df)):
-        c = df.iloc[i]
-        if direction == "BUY":
-            if c['low'] < swing_low and min(c['open'], c['close']) >= swing_low:
-                result["swept"] = True
-                if result["wick_level"] is None or c['low'] < result["wick_level"]:
-                    result["wick_level"] = c['low']
-        elif direction == "SELL":
-            if c['high'] > swing_high and max(c['open'], c['close']) <= swing_high:
-                result["swept"] = True
-                if result["wick_level"] is None or c['high'] > result["wick_level"]:
-                    result["wick_level"] = c['high']
-    return result
+def _inducement_core(h, l, body_top, body_bottom, swing_high, swing_low, buy):
+    """Numeric core of detect_inducement_swept(). Returns (swept, wick_level).
+
+    One mask over the window: a sweep bar's wick pierces the swing level
+    while its body stays on the near side; the deepest such wick wins.
+    """
+    if buy:
+        sweeps = (l < swing_low) & (body_bottom >= swing_low)
+        wicks = l[sweeps]
+        return (True, wicks.min()) if wicks.size else (False, None)
+    sweeps = (h > swing_high) & (body_top <= swing_high)
+    wicks = h[sweeps]
+    return (True, wicks.max()) if wicks.size else (False, None)
 
 
 # =====================
@@ -836,7 +1183,8 @@ def _compute_confidence(sweep_detected, engulfing, zone, fvg_match, touch_entry=
     return "low"
 
 
-def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
+def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False, memo=True,
+                   disk_cache=False):
     """Generate SMC trading signal using the MSNR Sniper Protocol.
 
     5-Layer Invalidation Filter:
@@ -852,32 +1200,261 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
                      detected alongside a fresh zone and compression arrival.
 
     Returns signal dict or None. Dict shape unchanged for scanner.py compat.
+    Results are memoized on the settings and a digest of the frames' OHLC
+    values, so re-evaluating unchanged candles (scanner passes between new
+    bars, parameter sweeps) skips the pipeline; each call gets its own dict.
+    Callers that never repeat a frame within a run (walk-forward prefixes)
+    pass memo=False to skip the in-memory cache. disk_cache=True also keeps
+    results in SIGNAL_CACHE_DIR (when set) so backtest reruns can reuse them.
     """
-    if df_l.empty or df_h.empty or len(df_l) < 23 or len(df_h) < 20:
+    if len(df_l) < 23 or len(df_h) < 20:
         return None
+    disk_cache = disk_cache and bool(SIGNAL_CACHE_DIR)
+    if not (memo or disk_cache):
+        return _smc_signal(df_l, df_h, pair, risk_pips, touch_trade)
+
+    key = (pair, risk_pips, touch_trade, _frame_digest(df_l), _frame_digest(df_h))
+    sig = _signal_cache.get(key, _MISSING) if memo else _MISSING
+    if sig is _MISSING:
+        if disk_cache:
+            sig = _stored_signal(key, df_l, df_h)
+        else:
+            sig = _smc_signal(df_l, df_h, pair, risk_pips, touch_trade)
+        if memo:
+            _signal_cache.put(key, sig)
+    return dict(sig) if sig is not None else None
+
+
+def get_smc_signal_raw(o, h, l, c, oh, hh, lh, ch, pair, risk_pips=50,
+                       touch_trade=False):
+    """get_smc_signal() on bare LTF (o, h, l, c) and HTF (oh, hh, lh, ch) arrays.
+
+    Skips building DataFrames for callers that already hold the columns.
+    """
+    return get_smc_signal(OHLC(*map(_float_column, (o, h, l, c))),
+                          OHLC(*map(_float_column, (oh, hh, lh, ch))),
+                          pair, risk_pips, touch_trade)
 
-    pip_val = get_pip_value(pair)
-    max_risk_price = risk_pips / pip_val
+
+def get_smc_signals(df_l, df_h, pair, risk_pips_values, touch_trade=False):
+    """get_smc_signal() for each of *risk_pips_values*, as a list in that order.
+
+    For risk parameter sweeps: the layers run once, and only the SL/TP
+    levels are recomputed per setting (risk_pips caps the SL distance and
+    nothing else). Results bypass the signal caches.
+    """
+    risk_pips_values = list(risk_pips_values)
+    if len(df_l) < 23 or len(df_h) < 20:
+        return [None] * len(risk_pips_values)
+    setup = _smc_setup(df_l, df_h, pair, touch_trade)
+    if setup is None:
+        return [None] * len(risk_pips_values)
+    return [_signal_levels(setup, _pair_profile(pair, risk_pips)[0])
+            for risk_pips in risk_pips_values]
+
+
+def _float_column(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+class _SizedLRU:
+    """Least-recently-used mapping bounded by the approximate bytes it holds."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        size = _approx_size(key) + _approx_size(value)
+        self._entries[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            self.nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+
+def _approx_size(obj):
+    """sys.getsizeof() of *obj* plus its direct items (tuples and dicts)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in obj.items())
+    elif isinstance(obj, tuple):
+        size += sum(sys.getsizeof(item) for item in obj)
+    return size
+
+
+# get_smc_signal() results keyed on (pair, risk_pips, touch_trade) and the
+# _frame_digest() of both frames, least recently used dropped first once
+# the entries exceed _SIGNAL_CACHE_BYTES.
+_SIGNAL_CACHE_BYTES = 8 * 1024 * 1024
+_signal_cache = _SizedLRU(_SIGNAL_CACHE_BYTES)
+_MISSING = object()
+
+
+def _stored_signal(key, df_l, df_h):
+    """_smc_signal() for a _signal_cache *key*, read through SIGNAL_CACHE_DIR.
+
+    Files are named by the SHA-256 of the key and written atomically, so
+    batch workers can share the directory. Unreadable files are recomputed
+    and overwritten; a directory other users can write to is not used.
+    I/O errors only cost the cache: the signal is still returned.
+    """
+    pair, risk_pips, touch_trade = key[:3]
+    try:
+        trusted = _trusted_cache_dir(SIGNAL_CACHE_DIR)
+    except OSError as e:
+        logger.warning("SIGNAL_CACHE_DIR %s unusable; disk cache disabled: %s",
+                       SIGNAL_CACHE_DIR, e)
+        trusted = False
+    if not trusted:
+        return _smc_signal(df_l, df_h, pair, risk_pips, touch_trade)
+
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()
+    path = os.path.join(SIGNAL_CACHE_DIR, digest + ".pkl")
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:  # truncated or foreign file: treat as a miss
+        logger.warning("Ignoring unreadable signal cache file %s: %s", path, e)
+
+    sig = _smc_signal(df_l, df_h, pair, risk_pips, touch_trade)
+    tmp = None
+    try:
+        with tempfile.NamedTemporaryFile("wb", dir=SIGNAL_CACHE_DIR, suffix=".tmp",
+                                         delete=False) as f:
+            tmp = f.name
+            pickle.dump(sig, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:  # disk full, directory removed mid-run, ...
+        logger.warning("Could not write signal cache file %s: %s", path, e)
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+    return sig
+
+
+def _trusted_cache_dir(path):
+    """True if *path* is (or is created as) a directory only this user can write.
+
+    The cache is unpickled, so a directory writable by anyone else could
+    be used to run code in this process. Checked on every use, since the
+    directory can be replaced or re-permissioned while the process runs.
+    Raises OSError if *path* cannot be created or inspected.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.stat(path)
+    owned = not hasattr(os, "getuid") or st.st_uid == os.getuid()
+    if owned and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return True
+    logger.warning("SIGNAL_CACHE_DIR %s is not private to this user; disk cache disabled", path)
+    return False
+
+
+def _smc_signal(df_l, df_h, pair, risk_pips, touch_trade):
+    """Uncached body of get_smc_signal(); the frames are already length-checked."""
+    setup = _smc_setup(df_l, df_h, pair, touch_trade)
+    if setup is None:
+        return None
+    return _signal_levels(setup, _pair_profile(pair, risk_pips)[0])
+
+
+@dataclass(slots=True)
+class _SignalSetup:
+    """A signal before SL/TP pricing: everything _smc_setup() decides.
+
+    None of it depends on risk_pips, so one setup can be priced for many
+    max risks by _signal_levels().
+    """
+    act: str
+    entry: float
+    last_close: float
+    sl_anchor: float
+    tp_target: float
+    htf_extreme: float
+    sl_multiplier: float
+    info: dict  # confidence .. volume_proxy, in signal dict order
+
+
+def _signal_levels(setup, max_risk_price):
+    """The get_smc_signal() dict for *setup* with SL capped at *max_risk_price*."""
+    limit_levels = calculate_levels(
+        setup.act, setup.entry, setup.sl_anchor, max_risk_price, setup.tp_target,
+        htf_extreme=setup.htf_extreme, sl_multiplier=setup.sl_multiplier,
+    )
+    market_levels = calculate_levels(
+        setup.act, setup.last_close, setup.sl_anchor, max_risk_price, setup.tp_target,
+        htf_extreme=setup.htf_extreme, sl_multiplier=setup.sl_multiplier,
+    )
+    return {
+        "act": setup.act,
+        "limit_e": setup.entry,
+        "limit_sl": limit_levels["sl"],
+        "market_e": setup.last_close,
+        "market_sl": market_levels["sl"],
+        "tp": limit_levels["tp"],
+        "tp1": limit_levels["tp1"],
+        "tp2": limit_levels["tp2"],
+        "tp3": limit_levels["tp3"],
+        **setup.info,
+    }
+
+
+def _smc_setup(df_l, df_h, pair, touch_trade):
+    """Layers 1-5 of get_smc_signal(): a _SignalSetup, or None if rejected."""
+    is_always_open = _always_open(pair)
+
+    # Cheap HTF gate first: the storyline needs fresh HTF zones, and the
+    # HTF context is cached on the HTF candles (shared across walk-forward
+    # steps and users), so most no-structure calls exit before any LTF work.
+    htf = _htf_context(df_h)
+    if not htf.fresh:
+        logger.debug("REJECT %s: storyline=None (no fresh HTF zones)", pair)
+        return None
 
     # --- Regime Detection (pre-filter) ---
     regime_info = detect_regime(df_l)
     atr = regime_info.get("atr") or None  # ATR for all sub-filters
 
-    is_always_open = any(k in pair.upper() for k in ALWAYS_OPEN_KEYS)
     if SKIP_VOLATILE_REGIME and regime_info["regime"] == "VOLATILE" and not is_always_open:
         logger.debug("REJECT %s: volatile regime (ATR ratio=%.2f, trend=%.3f)",
                       pair, regime_info.get("atr_ratio", 0), regime_info.get("trend_strength", 0))
         return None  # Don't trade chop (skip for crypto/synthetics — inherently volatile)
 
+    # One LTF scan feeds storyline, swing points, BOS, zones and sweep checks
+    ltf = _get_scan(df_l)
+
     # --- Layer 2: H4 Storyline ---
-    storyline = detect_storyline(df_h, df_l)
+    storyline = detect_storyline(df_h, df_l, ltf_scan=ltf, htf_context=htf)
     if storyline is None:
         logger.debug("REJECT %s: storyline=None (no HTF structure)", pair)
         return None
     bias = storyline["bias"]
 
     # Swing points + BOS
-    swing_high, swing_low = find_swing_points(df_l)
+    swing_high, swing_low = find_swing_points(df_l, scan=ltf)
     if swing_high is None:
         logger.debug("REJECT %s: no swing points found", pair)
         return None
@@ -887,7 +1464,8 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
     # ATR was silently rejecting signals where storyline said BULL but the
     # stricter BOS check found no bullish break.
     bos_atr = atr * 0.5 if atr else None
-    bos_info = detect_bos(df_l, swing_high, swing_low, atr=bos_atr, classify=True)
+    bos_info = detect_bos(df_l, swing_high, swing_low, atr=bos_atr, classify=True,
+                          scan=ltf)
     bullish_bos = bos_info["bullish_bos"]
     bearish_bos = bos_info["bearish_bos"]
     bull_sweep = bos_info["bull_sweep"]
@@ -901,7 +1479,7 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
         logger.debug("REJECT %s: BOS without FVG displacement", pair)
         return None
     bullish_bos, bearish_bos, bull_sweep, bear_sweep = detect_bos(
-        df_l, swing_high, swing_low, atr=atr
+        df_l, swing_high, swing_low, atr=atr, scan=ltf
     )
 
     # H4 Gatekeeper: FORBID trading against H4 bias
@@ -914,15 +1492,16 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
         return None
 
     # FVG (confluence bonus, not hard gate) — ATR-filtered, mitigation-aware
-    fvg = detect_fvg(df_l, atr=atr)
+    fvg = detect_fvg(df_l, atr=atr, scan=ltf)
 
-    c = df_l.iloc[-1]
+    # Current (last) LTF candle
+    last_high, last_low, last_close = ltf["high"][-1], ltf["low"][-1], ltf["close"][-1]
     storyline_tp = storyline.get("tp_target")
 
-    # All fresh LTF zones for roadblock scanning (ATR-aware)
-    all_fresh_ltf = find_zones(df_l, lookback=40, atr=atr)
-    all_fresh_ltf = mark_freshness(all_fresh_ltf, df_l)
-    all_fresh_ltf = [z for z in all_fresh_ltf if z["fresh"]]
+    # All fresh LTF zones for roadblock scanning (ATR-aware); the same
+    # freshness-marked set feeds the Layer 1 zone pick below.
+    ltf_table = _marked_zone_table(df_l, lookback=40, atr=atr, scan=ltf)
+    opposing_ltf = ZoneIndex.from_zones(ltf_table)
 
     if bias == "BULL":
         # Regime counter-trend check
@@ -932,14 +1511,13 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
             return None
 
         # --- Layer 1: Fresh Zone (ATR-aware) ---
-        fresh = get_fresh_zones(df_l, "demand", atr=atr)
-        zone = fresh[0] if fresh else None
+        zone = _best_fresh_zone(ltf_table, "demand")
         if zone is None:
             logger.debug("REJECT %s BUY: no fresh demand zone", pair)
             return None  # No fresh zone = no trade
 
         entry_price = zone["top"]
-        tp_target = storyline_tp if storyline_tp else df_h['high'].max()
+        tp_target = storyline_tp if storyline_tp else htf.high
 
         # --- Premium/Discount Filter ---
         if USE_PREMIUM_DISCOUNT_FILTER:
@@ -951,31 +1529,29 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
             pd_zone = is_in_premium_discount(entry_price, swing_high, swing_low)
 
         # --- Layer 3: Arrival Physics (direction-aware) ---
-        if not analyze_arrival(df_l, zone["top"], "demand"):
+        if not analyze_arrival(df_l, zone["top"], "demand", scan=ltf):
             logger.debug("REJECT %s BUY: arrival physics failed", pair)
             return None  # Adverse momentum arrival — invalidated
 
         # --- Layer 4: Roadblock RR Check ---
         risk_distance = abs(entry_price - zone["bottom"])
-        if risk_distance <= 0:
-            risk_distance = max_risk_price
-        if not check_roadblocks(entry_price, "BUY", all_fresh_ltf, risk_distance):
+        # Nearest roadblock (hard RR) and soft roadblock (for confidence) in one scan
+        nearest, roadblock_near = analyze_opposing(
+            opposing_ltf, "BULL", entry_price, None, tp_hint=tp_target)
+        if not _rr_clear(nearest, entry_price, risk_distance):
             logger.debug("REJECT %s BUY: roadblock RR failed", pair)
             return None  # RR < 1:2 to nearest roadblock — kill trade
 
-        # Soft roadblock check (for confidence)
-        roadblock_near = _check_roadblock(all_fresh_ltf, "BULL", entry_price, tp_target)
-
         # Retest check
-        retest_ok = c['low'] <= zone['top'] and c['high'] >= zone['bottom']
+        retest_ok = last_low <= zone['top'] and last_high >= zone['bottom']
 
         # --- Layer 5: Trigger (ATR-filtered engulfing) ---
         engulfing = None
         if retest_ok:
-            engulfing = detect_engulfing(df_l, zone, atr=atr)
+            engulfing = detect_engulfing(df_l, zone, atr=atr, scan=ltf)
 
         # Inducement / Sweep check
-        induce = detect_inducement_swept(df_l, swing_high, swing_low, "BUY")
+        induce = detect_inducement_swept(df_l, swing_high, swing_low, "BUY", scan=ltf)
         sweep_detected = induce["swept"]
 
         # Inducement hard gate (optional, off by default)
@@ -999,7 +1575,7 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
         )
 
         # Volume proxy as confidence gate (not just display)
-        vol_proxy = compute_volume_proxy(df_l, zone)
+        vol_proxy = compute_volume_proxy(df_l, zone, scan=ltf)
         if vol_proxy < 0.3 and confidence != "high":
             logger.debug("REJECT %s BUY: volume proxy too low (%.2f)", pair, vol_proxy)
             return None
@@ -1034,26 +1610,8 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
         if zone["miss"]:
             sl_mult *= 0.85  # strong displacement = tighter SL
 
-        htf_extreme = df_h['high'].max()
-        limit_levels = calculate_levels(
-            "BUY", entry_price, sl_anchor, max_risk_price, tp_target,
-            htf_extreme=htf_extreme, sl_multiplier=sl_mult,
-        )
-        market_levels = calculate_levels(
-            "BUY", c['close'], sl_anchor, max_risk_price, tp_target,
-            htf_extreme=htf_extreme, sl_multiplier=sl_mult,
-        )
-
-        return {
-            "act": "BUY",
-            "limit_e": entry_price,
-            "limit_sl": limit_levels["sl"],
-            "market_e": c['close'],
-            "market_sl": market_levels["sl"],
-            "tp": limit_levels["tp"],
-            "tp1": limit_levels["tp1"],
-            "tp2": limit_levels["tp2"],
-            "tp3": limit_levels["tp3"],
+        return _SignalSetup("BUY", entry_price, last_close, sl_anchor, tp_target,
+                            htf.high, sl_mult, {
             "confidence": confidence,
             "zone_type": zone["type"],
             "miss": zone["miss"],
@@ -1064,7 +1622,7 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
             "atr": regime_info["atr"],
             "sl_multiplier": regime_info["sl_multiplier"],
             "volume_proxy": vol_proxy,
-        }
+        })
 
     if bias == "BEAR":
         # Regime counter-trend check
@@ -1074,14 +1632,13 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
             return None
 
         # --- Layer 1: Fresh Zone (ATR-aware) ---
-        fresh = get_fresh_zones(df_l, "supply", atr=atr)
-        zone = fresh[0] if fresh else None
+        zone = _best_fresh_zone(ltf_table, "supply")
         if zone is None:
             logger.debug("REJECT %s SELL: no fresh supply zone", pair)
             return None
 
         entry_price = zone["bottom"]
-        tp_target = storyline_tp if storyline_tp else df_h['low'].min()
+        tp_target = storyline_tp if storyline_tp else htf.low
 
         # --- Premium/Discount Filter ---
         if USE_PREMIUM_DISCOUNT_FILTER:
@@ -1093,27 +1650,26 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
             pd_zone = is_in_premium_discount(entry_price, swing_high, swing_low)
 
         # --- Layer 3: Arrival Physics (direction-aware) ---
-        if not analyze_arrival(df_l, zone["bottom"], "supply"):
+        if not analyze_arrival(df_l, zone["bottom"], "supply", scan=ltf):
             logger.debug("REJECT %s SELL: arrival physics failed", pair)
             return None
 
         # --- Layer 4: Roadblock RR Check ---
         risk_distance = abs(zone["top"] - entry_price)
-        if risk_distance <= 0:
-            risk_distance = max_risk_price
-        if not check_roadblocks(entry_price, "SELL", all_fresh_ltf, risk_distance):
+        # Nearest roadblock (hard RR) and soft roadblock (for confidence) in one scan
+        nearest, roadblock_near = analyze_opposing(
+            opposing_ltf, "BEAR", entry_price, None, tp_hint=tp_target)
+        if not _rr_clear(nearest, entry_price, risk_distance):
             logger.debug("REJECT %s SELL: roadblock RR failed", pair)
             return None
 
-        roadblock_near = _check_roadblock(all_fresh_ltf, "BEAR", entry_price, tp_target)
-
-        retest_ok = c['high'] >= zone['bottom'] and c['low'] <= zone['top']
+        retest_ok = last_high >= zone['bottom'] and last_low <= zone['top']
 
         engulfing = None
         if retest_ok:
-            engulfing = detect_engulfing(df_l, zone, atr=atr)
+            engulfing = detect_engulfing(df_l, zone, atr=atr, scan=ltf)
 
-        induce = detect_inducement_swept(df_l, swing_high, swing_low, "SELL")
+        induce = detect_inducement_swept(df_l, swing_high, swing_low, "SELL", scan=ltf)
         sweep_detected = induce["swept"]
 
         # Inducement hard gate (optional, off by default)
@@ -1137,7 +1693,7 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
         )
 
         # Volume proxy as confidence gate (not just display)
-        vol_proxy = compute_volume_proxy(df_l, zone)
+        vol_proxy = compute_volume_proxy(df_l, zone, scan=ltf)
         if vol_proxy < 0.3 and confidence != "high":
             logger.debug("REJECT %s SELL: volume proxy too low (%.2f)", pair, vol_proxy)
             return None
@@ -1171,26 +1727,8 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
         if zone["miss"]:
             sl_mult *= 0.85  # strong displacement = tighter SL
 
-        htf_extreme = df_h['low'].min()
-        limit_levels = calculate_levels(
-            "SELL", entry_price, sl_anchor, max_risk_price, tp_target,
-            htf_extreme=htf_extreme, sl_multiplier=sl_mult,
-        )
-        market_levels = calculate_levels(
-            "SELL", c['close'], sl_anchor, max_risk_price, tp_target,
-            htf_extreme=htf_extreme, sl_multiplier=sl_mult,
-        )
-
-        return {
-            "act": "SELL",
-            "limit_e": entry_price,
-            "limit_sl": limit_levels["sl"],
-            "market_e": c['close'],
-            "market_sl": market_levels["sl"],
-            "tp": limit_levels["tp"],
-            "tp1": limit_levels["tp1"],
-            "tp2": limit_levels["tp2"],
-            "tp3": limit_levels["tp3"],
+        return _SignalSetup("SELL", entry_price, last_close, sl_anchor, tp_target,
+                            htf.low, sl_mult, {
             "confidence": confidence,
             "zone_type": zone["type"],
             "miss": zone["miss"],
@@ -1201,6 +1739,47 @@ def get_smc_signal(df_l, df_h, pair, risk_pips=50, touch_trade=False):
             "atr": regime_info["atr"],
             "sl_multiplier": regime_info["sl_multiplier"],
             "volume_proxy": vol_proxy,
-        }
+        })
 
     return None
+
+
+@lru_cache(maxsize=None)
+def get_signal_fn(pair, risk_pips=50, touch_trade=False, memo=True,
+                  disk_cache=False):
+    """get_smc_signal() bound to one pair's settings: call it as fn(df_l, df_h).
+
+    Callers that run the same pair repeatedly (walk-forward backtests, the
+    scanner loop) keep the returned function instead of re-passing the pair
+    settings; the pip-derived constants are resolved once per pair.
+    """
+    return partial(get_smc_signal, pair=pair, risk_pips=risk_pips,
+                   touch_trade=touch_trade, memo=memo, disk_cache=disk_cache)
+
+
+def _signal_worker(job):
+    """Process-pool entry point: job = (df_l, df_h, pair, risk_pips, touch_trade)."""
+    return get_smc_signal(*job)
+
+
+def get_smc_signals_batch(df_ls, df_hs, pairs, risk_pips=50, touch_trade=False,
+                          max_workers=None):
+    """Run get_smc_signal() for many pairs, fanned out over a process pool.
+
+    The signal pipeline is pure CPU work per pair, so independent pairs scale
+    with core count. With max_workers=1 (or a single pair) everything runs
+    in-process.
+
+    Returns a list of signal dicts / None aligned with *pairs*. Raises
+    ValueError if *df_ls*, *df_hs* and *pairs* differ in length.
+    """
+    if not len(df_ls) == len(df_hs) == len(pairs):
+        raise ValueError(
+            f"df_ls, df_hs and pairs differ in length: "
+            f"{len(df_ls)}, {len(df_hs)}, {len(pairs)}")
+    jobs = [(df_l, df_h, pair, risk_pips, touch_trade)
+            for df_l, df_h, pair in zip(df_ls, df_hs, pairs)]
+    if max_workers == 1 or len(jobs) <= 1:
+        return [_signal_worker(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_signal_worker, jobs))
@@ -1,4 +1,6 @@
 import sys
+import tempfile
+from unittest.mock import patch
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -8,6 +10,15 @@ from backtester import (
     _walk_forward, _evaluate_signal, run_backtest,
     _build_summary, format_backtest_result,
 )
+from strategy import _signal_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_signal_cache():
+    """Every test starts and ends with an empty get_smc_signal() memo."""
+    _signal_cache.clear()
+    yield
+    _signal_cache.clear()
 
 
 def make_ohlc(data):
@@ -227,6 +238,27 @@ class TestRunBacktest:
         assert result["trades"] == []
         assert result["summary"]["total"] == 0
 
+    def test_walk_forward_bypasses_signal_memo(self):
+        """Each window is a new prefix: nothing is hashed into the memo."""
+        df_l = make_trending_data("up", bars=60)
+        df_h = make_ohlc([(1.0, 1.01, 0.99, 1.0)] * 25)
+        assert list(_walk_forward(df_l, df_h, "EURUSD")) == []
+        assert len(_signal_cache) == 0
+
+    def test_walk_forward_reruns_read_cache_dir(self):
+        """With SIGNAL_CACHE_DIR set, a second run over the same candles skips the pipeline."""
+        df_l = make_trending_data("up", bars=60)
+        df_h = make_ohlc([(1.0, 1.01, 0.99, 1.0)] * 25)
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch("strategy.SIGNAL_CACHE_DIR", cache_dir):
+            with patch("strategy._smc_signal", return_value=None) as body:
+                assert list(_walk_forward(df_l, df_h, "EURUSD")) == []
+                assert body.call_count == len(df_l) - 50
+                assert len(os.listdir(cache_dir)) == len(df_l) - 50
+                assert list(_walk_forward(df_l, df_h, "EURUSD")) == []
+                assert body.call_count == len(df_l) - 50
+        assert len(_signal_cache) == 0
+
     def test_cooldown_prevents_overtrading(self):
         """Cooldown should prevent signals on consecutive bars."""
         df_l = make_trending_data("up", bars=100, start=1.0, step=0.001)
@@ -1,5 +1,8 @@
 import sys
 import os
+import tempfile
+from functools import lru_cache
+from unittest.mock import patch
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import pytest
@@ -10,8 +13,11 @@ from strategy import (
     detect_bos, detect_fvg, calculate_levels, get_smc_signal,
     find_zones, mark_freshness, get_fresh_zones,
     detect_storyline, detect_engulfing, detect_inducement_swept,
-    _opposing_zone_tp, _check_roadblock, check_roadblocks,
-    analyze_arrival,
+    _opposing_zone_tp, _check_roadblock, check_roadblocks, analyze_opposing,
+    analyze_arrival, get_smc_signals_batch, get_signal_fn, get_smc_signal_raw,
+    get_smc_signals,
+    Zone, Zones, ZoneType, OHLC, ZoneIndex,
+    _scan, _get_scan, _signal_cache, _htf_context, _SizedLRU, _SignalSetup,
 )
 
 
@@ -19,82 +25,166 @@ from strategy import (
 # HELPERS
 # =====================
 def make_ohlc(data):
-    """Create a DataFrame from a list of (open, high, low, close) tuples."""
-    df = pd.DataFrame(data, columns=['open', 'high', 'low', 'close'])
-    return df.astype(float)
+    """Create a DataFrame from (open, high, low, close) rows or an (n, 4) array.
 
+    Frames are memoized on the raw float64 bytes and backed by a read-only
+    array, so tests that repeat a fixture share one frame and cannot mutate it.
+    """
+    return _make_ohlc_cached(np.asarray(data, dtype=np.float64).tobytes())
 
-def make_trending_data(direction, bars=30, start=1.0, step=0.001):
-    """Generate trending OHLC data."""
-    data = []
-    price = start
-    for i in range(bars):
-        if direction == "up":
-            o = price
-            h = price + step * 0.8
-            l = price - step * 0.2
-            c = price + step * 0.6
-            price += step
-        else:
-            o = price
-            h = price + step * 0.2
-            l = price - step * 0.8
-            c = price - step * 0.6
-            price -= step
-        data.append((o, h, l, c))
-    return make_ohlc(data)
 
+@lru_cache(maxsize=512)
+def _make_ohlc_cached(raw):
+    block = np.frombuffer(raw, dtype=np.float64).reshape(-1, 4)
+    return pd.DataFrame(block, columns=['open', 'high', 'low', 'close'], copy=False)
+
+
+def _make_up(bars, start, step):
+    """Rising (bars, 4) OHLC array: every candle closes above its open."""
+    opens = start + np.arange(bars) * step
+    return np.column_stack([opens, opens + step * 0.8, opens - step * 0.2,
+                            opens + step * 0.6])
+
+
+def _make_down(bars, start, step):
+    """Falling (bars, 4) OHLC array: every candle closes below its open."""
+    opens = start - np.arange(bars) * step
+    return np.column_stack([opens, opens + step * 0.2, opens - step * 0.8,
+                            opens - step * 0.6])
+
+
+def zones_by(zones, **criteria):
+    """Zones whose fields equal every keyword in *criteria*, in order."""
+    items = tuple(criteria.items())
+    return list(filter(lambda z: all(z[k] == v for k, v in items), zones))
+
+
+def _rows(*values):
+    """(n, 4) float64 OHLC array from flat open, high, low, close values."""
+    return np.array(values, dtype=np.float64).reshape(-1, 4)
+
+
+def _columns(data):
+    """(open, high, low, close) float64 columns of OHLC rows or a frame."""
+    return np.asarray(data, dtype=np.float64).reshape(-1, 4).T
+
+
+def _flat_base(row, bars=20):
+    """Read-only (bars, 4) view repeating a single OHLC row (no per-bar copies)."""
+    return np.broadcast_to(np.asarray(row, dtype=np.float64), (bars, 4))
+
+
+@pytest.fixture(autouse=True)
+def empty_signal_cache():
+    """Every test starts and ends with an empty get_smc_signal() memo."""
+    _signal_cache.clear()
+    yield
+    _signal_cache.clear()
+
+
+# Flat 20-bar bases shared by the BOS / signal tests; stacked with per-test
+# tails. Module-scoped so each is built once per test run.
+@pytest.fixture(scope="module")
+def flat_105_95():
+    return _flat_base((1.0, 1.05, 0.95, 1.0))
+
+
+@pytest.fixture(scope="module")
+def flat_104_96():
+    return _flat_base((1.0, 1.04, 0.96, 1.0))
+
+
+@pytest.fixture(scope="module")
+def flat_102_98():
+    return _flat_base((1.0, 1.02, 0.98, 1.01))
 
-# =====================
-# PIP VALUE TESTS
-# =====================
-class TestGetPipValue:
-    def test_forex_major(self):
-        # EURUSD contains 'EUR' which is a DERIV keyword, falls through to
-        # HIGH_PIP_SYMBOLS check. The function returns 10000 only for pairs
-        # that don't match any keyword. EURUSD matches 'EUR' → returns 10 (HIGH_PIP).
-        # For a pure forex pair that doesn't match any keyword, it'd be 10000.
-        # EURUSD is a valid forex pair returning 10 due to keyword matching.
-        assert get_pip_value("EURUSD") == 10
 
-    def test_jpy_pair(self):
-        assert get_pip_value("USDJPY") == 10
+@pytest.fixture(scope="module")
+def empty_frame():
+    return pd.DataFrame()
 
-    def test_gold(self):
-        assert get_pip_value("XAUUSD") == 10
 
-    def test_index(self):
-        assert get_pip_value("US30") == 10
+@pytest.fixture(scope="module")
+def flat_10():
+    """10 identical bars: too short for any LTF/HTF pipeline."""
+    return make_ohlc(_flat_base((1.0, 1.1, 0.9, 1.0), 10))
 
-    def test_volatility(self):
-        assert get_pip_value("V75") == 10
 
-    def test_boom_crash(self):
-        assert get_pip_value("BOOM300") == 10
+@pytest.fixture(scope="module")
+def htf_uptrend():
+    """25-bar rising HTF frame shared by the signal tests."""
+    return make_trending_data("up", bars=25, start=1.0, step=0.002)
 
-    def test_crypto_btc(self):
-        assert get_pip_value("BTCUSD") == 0.1
 
-    def test_crypto_eth(self):
-        assert get_pip_value("ETHUSDT") == 1
+@pytest.fixture(scope="module")
+def htf_up_25():
+    return make_trending_data("up", bars=25)
 
-    def test_crypto_sol(self):
-        assert get_pip_value("SOLUSDT") == 10
 
-    def test_case_insensitive(self):
-        assert get_pip_value("xauusd") == 10
+@pytest.fixture(scope="module")
+def htf_down_25():
+    return make_trending_data("down", bars=25)
+
+
+@pytest.fixture(scope="module")
+def ltf_up_30():
+    return make_trending_data("up", bars=30)
+
+
+@pytest.fixture(scope="module")
+def buy_setup_ltf(flat_102_98):
+    """Flat base + rising LTF tail used by the BUY signal field tests."""
+    return make_ohlc(np.vstack([flat_102_98, _rows(
+        1.01, 1.035, 1.005, 1.03,
+        1.03, 1.04, 1.025, 1.035,
+        1.035, 1.045, 1.03, 1.04,
+        1.04, 1.05, 1.035, 1.045,
+        1.045, 1.06, 1.046, 1.055,
+    )]))
+
+
+@lru_cache(maxsize=64)
+def make_trending_data(direction, bars=30, start=1.0, step=0.001):
+    """Generate trending OHLC data (memoized; the frame is read-only)."""
+    builder = _make_up if direction == "up" else _make_down
+    return make_ohlc(builder(bars, start, step))
+
+
+# =====================
+# PIP VALUE TESTS
+# =====================
+class TestGetPipValue:
+    # EURUSD contains 'EUR' which is a DERIV keyword, falls through to
+    # HIGH_PIP_SYMBOLS check. The function returns 10000 only for pairs
+    # that don't match any keyword. EURUSD matches 'EUR' → returns 10 (HIGH_PIP).
+    # For a pure forex pair that doesn't match any keyword, it'd be 10000.
+    # EURUSD is a valid forex pair returning 10 due to keyword matching.
+    @pytest.mark.parametrize("pair, expected", [
+        ("EURUSD", 10),     # forex major
+        ("USDJPY", 10),     # JPY pair
+        ("XAUUSD", 10),     # gold
+        ("US30", 10),       # index
+        ("V75", 10),        # volatility
+        ("BOOM300", 10),    # boom/crash
+        ("BTCUSD", 0.1),    # crypto: BTC
+        ("ETHUSDT", 1),     # crypto: ETH
+        ("SOLUSDT", 10),    # crypto: SOL
+        ("xauusd", 10),     # case insensitive
+    ])
+    def test_pip_value(self, pair, expected):
+        assert get_pip_value(pair) == expected
 
 
 # =====================
 # BIAS DETECTION TESTS
 # =====================
 class TestDetectBias:
-    def test_bullish_bias(self):
-        df = make_trending_data("up", bars=25)
+    def test_bullish_bias(self, htf_up_25):
+        df = htf_up_25
         assert detect_bias(df) == "BULL"
 
-    def test_bearish_bias(self):
-        df = make_trending_data("down", bars=25)
+    def test_bearish_bias(self, htf_down_25):
+        df = htf_down_25
         assert detect_bias(df) == "BEAR"
 
     def test_insufficient_data(self):
@@ -106,8 +196,7 @@ class TestDetectBias:
         assert detect_bias(df, lookback=10) == "BULL"
 
     def test_flat_market_bearish(self):
-        data = [(1.0, 1.1, 0.9, 1.0)] * 25
-        df = make_ohlc(data)
+        df = make_ohlc(_flat_base((1.0, 1.1, 0.9, 1.0), 25))
         assert detect_bias(df) == "BEAR"
 
 
@@ -128,7 +217,7 @@ class TestFindSwingPoints:
         assert sh > sl
 
     def test_insufficient_data(self):
-        df = make_ohlc([(1, 1.1, 0.9, 1)] * 5)
+        df = make_ohlc(_flat_base((1, 1.1, 0.9, 1), 5))
         sh, sl = find_swing_points(df)
         assert sh is None
         assert sl is None
@@ -139,52 +228,59 @@ class TestFindSwingPoints:
         sh, sl = find_swing_points(df, start=-10, end=-2)
         assert sh is not None
 
+    def test_scan_swing_columns_match_every_bar(self):
+        data = [(1.0, 1.0 + (i % 7) * 0.01, 0.9 - (i % 4) * 0.01, 1.0)
+                for i in range(30)]
+        df = make_ohlc(data)
+        scan = _scan(*(df[col].to_numpy() for col in ['open', 'high', 'low', 'close']))
+        for n in range(23, 31):
+            assert (scan["swing_high"][n - 1], scan["swing_low"][n - 1]) \
+                == find_swing_points(df.iloc[:n])
+        assert np.isnan(scan["swing_high"][21])
+
 
 # =====================
 # BOS DETECTION TESTS
 # =====================
 class TestDetectBOS:
-    def test_bullish_bos(self):
-        data = [(1.0, 1.05, 0.95, 1.0)] * 20
-        data += [(1.0, 1.08, 0.98, 1.06)] * 5  # body closes above swing high
+    def test_bullish_bos(self, flat_105_95):
+        # body closes above swing high
+        data = np.vstack([flat_105_95, _flat_base((1.0, 1.08, 0.98, 1.06), 5)])
         df = make_ohlc(data)
         bullish, bearish, bull_sw, bear_sw = detect_bos(df, 1.05, 0.95)
-        assert bool(bullish) is True
+        assert bullish
         assert bull_sw is False  # not a sweep, it's a real break
 
-    def test_bearish_bos(self):
-        data = [(1.0, 1.05, 0.95, 1.0)] * 20
-        data += [(1.0, 1.02, 0.90, 0.93)] * 5  # body closes below swing low
+    def test_bearish_bos(self, flat_105_95):
+        # body closes below swing low
+        data = np.vstack([flat_105_95, _flat_base((1.0, 1.02, 0.90, 0.93), 5)])
         df = make_ohlc(data)
         bullish, bearish, bull_sw, bear_sw = detect_bos(df, 1.05, 0.95)
-        assert bool(bearish) is True
+        assert bearish
         assert bear_sw is False
 
     def test_no_bos(self):
-        data = [(1.0, 1.04, 0.96, 1.0)] * 25
-        df = make_ohlc(data)
+        df = make_ohlc(_flat_base((1.0, 1.04, 0.96, 1.0), 25))
         bullish, bearish, bull_sw, bear_sw = detect_bos(df, 1.05, 0.95)
-        assert bool(bullish) is False
-        assert bool(bearish) is False
+        assert not bullish
+        assert not bearish
 
     def test_insufficient_data(self):
-        df = make_ohlc([(1.0, 1.1, 0.9, 1.0)] * 2)
+        df = make_ohlc(_flat_base((1.0, 1.1, 0.9, 1.0), 2))
         result = detect_bos(df, 1.1, 0.9, lookback=5)
         assert result == (False, False, False, False)
 
-    def test_bull_sweep_wick_only(self):
+    def test_bull_sweep_wick_only(self, flat_104_96):
         """Wick above swing high but body closes below = bull sweep, not BOS."""
-        data = [(1.0, 1.04, 0.96, 1.0)] * 20
-        data += [(1.02, 1.06, 1.01, 1.03)] * 5
+        data = np.vstack([flat_104_96, _flat_base((1.02, 1.06, 1.01, 1.03), 5)])
         df = make_ohlc(data)
         bullish, bearish, bull_sw, bear_sw = detect_bos(df, 1.05, 0.95)
         assert bullish is False
         assert bull_sw is True
 
-    def test_bear_sweep_wick_only(self):
+    def test_bear_sweep_wick_only(self, flat_104_96):
         """Wick below swing low but body closes above = bear sweep, not BOS."""
-        data = [(1.0, 1.04, 0.96, 1.0)] * 20
-        data += [(0.98, 1.02, 0.93, 0.97)] * 5
+        data = np.vstack([flat_104_96, _flat_base((0.98, 1.02, 0.93, 0.97), 5)])
         df = make_ohlc(data)
         bullish, bearish, bull_sw, bear_sw = detect_bos(df, 1.05, 0.95)
         assert bearish is False
@@ -235,27 +331,17 @@ class TestDetectFVG:
 # LEVEL CALCULATION TESTS
 # =====================
 class TestCalculateLevels:
-    def test_buy_sl_within_risk(self):
-        levels = calculate_levels("BUY", 1.1000, 0.9900, 0.0050, 1.1500)
-        assert levels["sl"] == pytest.approx(1.1000 - 0.0050)
-        assert levels["tp"] == 1.1500
-
-    def test_buy_sl_raw_when_small(self):
-        levels = calculate_levels("BUY", 1.1000, 1.0980, 0.0050, 1.1500)
-        assert levels["sl"] == pytest.approx(1.0980)
-
-    def test_buy_sl_capped(self):
-        levels = calculate_levels("BUY", 1.1000, 1.0500, 0.0050, 1.1500)
-        assert levels["sl"] == pytest.approx(1.1000 - 0.0050)
-
-    def test_sell_sl_raw_when_small(self):
-        levels = calculate_levels("SELL", 1.1000, 1.1020, 0.0050, 1.0500)
-        assert levels["sl"] == pytest.approx(1.1020)
-        assert levels["tp"] == 1.0500
-
-    def test_sell_sl_capped(self):
-        levels = calculate_levels("SELL", 1.1000, 1.1600, 0.0050, 1.0500)
-        assert levels["sl"] == pytest.approx(1.1000 + 0.0050)
+    @pytest.mark.parametrize("sig_type, sl_anchor, tp_target, expected_sl", [
+        ("BUY", 0.9900, 1.1500, 1.1000 - 0.0050),   # far anchor → capped at max risk
+        ("BUY", 1.0980, 1.1500, 1.0980),            # raw SL when within max risk
+        ("BUY", 1.0500, 1.1500, 1.1000 - 0.0050),   # capped
+        ("SELL", 1.1020, 1.0500, 1.1020),           # raw SL when within max risk
+        ("SELL", 1.1600, 1.0500, 1.1000 + 0.0050),  # capped
+    ])
+    def test_sl_and_target(self, sig_type, sl_anchor, tp_target, expected_sl):
+        levels = calculate_levels(sig_type, 1.1000, sl_anchor, 0.0050, tp_target)
+        assert levels["sl"] == expected_sl
+        assert levels["tp"] == tp_target
 
 
 # =====================
@@ -270,7 +356,7 @@ class TestFindZones:
         ]
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
-        a_zones = [z for z in zones if z["type"] == "A"]
+        a_zones = zones_by(zones, type="A")
         assert len(a_zones) == 1
         assert a_zones[0]["direction"] == "supply"
         assert a_zones[0]["top"] == 1.025
@@ -284,7 +370,7 @@ class TestFindZones:
         ]
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
-        v_zones = [z for z in zones if z["type"] == "V"]
+        v_zones = zones_by(zones, type="V")
         assert len(v_zones) == 1
         z = v_zones[0]
         assert z["direction"] == "demand"
@@ -299,7 +385,7 @@ class TestFindZones:
         ]
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
-        oc_zones = [z for z in zones if z["type"] == "OC"]
+        oc_zones = zones_by(zones, type="OC")
         assert len(oc_zones) == 1
         z = oc_zones[0]
         assert z["direction"] == "demand"
@@ -324,11 +410,90 @@ class TestFindZones:
         assert "A" in types
         assert "V" in types
 
+    def test_ohlc_struct_matches_dataframe(self):
+        data = _make_up(15, 1.0, 0.002)
+        data[5:8] = _make_down(3, 1.01, 0.003)
+        df, ohlc = make_ohlc(data), OHLC.from_rows(data)
+        assert len(ohlc) == len(df)
+        assert ohlc.c.flags.c_contiguous
+        assert mark_freshness(find_zones(ohlc), ohlc) \
+            == mark_freshness(find_zones(df), df)
+        assert get_fresh_zones(ohlc, "demand") == get_fresh_zones(df, "demand")
+        sh, sl = 1.02, 1.0
+        assert detect_bos(ohlc, sh, sl) == detect_bos(df, sh, sl)
+        assert detect_inducement_swept(ohlc, sh, sl, "BUY") \
+            == detect_inducement_swept(df, sh, sl, "BUY")
+
+        head = ohlc.head(10)
+        assert len(head) == 10 and np.shares_memory(head.c, ohlc.c)
+        assert find_zones(head) == find_zones(make_ohlc(data[:10]))
+
+    def test_zones_table_round_trip(self):
+        data = _make_up(12, 1.0, 0.002)
+        data[4:7] = _make_down(3, 1.006, 0.003)
+        df = make_ohlc(data)
+        zones = mark_freshness(find_zones(df), df)
+        table = Zones.from_list(zones)
+        assert len(table) == len(zones)
+        assert table.to_list() == zones
+        flips = table.kind == ZoneType.FLIP
+        assert flips.sum() == len(zones_by(zones, type="FLIP")) > 0
+        assert (table.age[flips] == -1).all()
+
+    def test_zones_ranked_strongest_first(self):
+        """ranked(): fresh rows of one side, FLIP > displacement > MISS > recency."""
+        zones = [
+            Zone("V", "demand", 1.01, 1.00, 5, miss=True),
+            Zone("V", "demand", 1.01, 1.00, 8),
+            Zone("V", "demand", 1.01, 1.00, 2, displacement=True),
+            Zone("FLIP", "demand", 1.01, 1.00, 1),
+            Zone("V", "demand", 1.01, 1.00, 9, fresh=False),
+            Zone("A", "supply", 1.05, 1.04, 9),
+        ]
+        table = Zones.from_list(zones)
+        assert table.kind.tolist() == [ZoneType.V] * 3 + [ZoneType.FLIP, ZoneType.V, ZoneType.A]
+        assert table.ranked("demand").tolist() == [3, 2, 0, 1]
+        assert table.ranked("supply").tolist() == [5]
+
+    def test_zone_item_access_mirrors_attributes(self):
+        data = [
+            (1.02, 1.03, 0.98, 0.99),  # bearish
+            (1.00, 1.03, 0.98, 1.02),  # bullish → V-level
+        ]
+        z = find_zones(make_ohlc(data), lookback=40)[0]
+        assert isinstance(z, Zone)
+        assert z["direction"] == z.direction == "demand"
+        z["fresh"] = False
+        assert z.fresh is False
+        assert z.get("displacement", False) is z.displacement
+        assert z.get("missing", "default") == "default"
+        assert "miss" in z and "missing" not in z
+        assert z.to_dict() == {
+            "type": "V", "direction": "demand", "top": z.top, "bottom": z.bottom,
+            "bar_index": 0, "fresh": False, "miss": False,
+            "displacement": z.displacement, "age": z.age,
+        }
+
 
 # =====================
 # FRESHNESS TESTS
 # =====================
 class TestFreshness:
+    def test_hand_built_zones_without_type(self):
+        """Zone dicts only need geometry and freshness, as before the table rewrite."""
+        df = make_ohlc(_rows(
+            1.00, 1.03, 0.99, 1.025,
+            1.02, 1.03, 0.98, 0.99,
+            0.98, 1.021, 0.97, 0.98,    # wick enters the zone
+            0.97, 0.98, 0.96, 0.975,
+        ))
+        zones = [{"direction": "supply", "top": 1.025, "bottom": 1.02,
+                  "bar_index": 0, "fresh": True}]
+        marked = mark_freshness(zones, df)
+        assert marked is zones
+        assert zones[0] == {"direction": "supply", "top": 1.025, "bottom": 1.02,
+                            "bar_index": 0, "fresh": False}
+
     def test_zone_becomes_unfresh_on_wick_touch(self):
         """If a subsequent candle's wick enters the zone, it becomes unfresh."""
         data = [
@@ -340,7 +505,7 @@ class TestFreshness:
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
         zones = mark_freshness(zones, df)
-        a_zones = [z for z in zones if z["type"] == "A" and z["bar_index"] == 0]
+        a_zones = zones_by(zones, type="A", bar_index=0)
         assert len(a_zones) == 1
         assert a_zones[0]["fresh"] is False
 
@@ -359,7 +524,7 @@ class TestFreshness:
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
         zones = mark_freshness(zones, df)
-        a_zones = [z for z in zones if z["type"] == "A" and z["bar_index"] == 0]
+        a_zones = zones_by(zones, type="A", bar_index=0)
         assert len(a_zones) == 1
         assert a_zones[0]["fresh"] is True
 
@@ -376,7 +541,7 @@ class TestFreshness:
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
         zones = mark_freshness(zones, df)
-        a_zones = [z for z in zones if z["type"] == "A" and z["bar_index"] == 0]
+        a_zones = zones_by(zones, type="A", bar_index=0)
         assert len(a_zones) == 1
         assert a_zones[0]["miss"] is True
         assert a_zones[0]["fresh"] is True
@@ -396,7 +561,7 @@ class TestFreshness:
         df = make_ohlc(data)
         zones = find_zones(df, lookback=40)
         zones = mark_freshness(zones, df)
-        a_zones = [z for z in zones if z["type"] == "A" and z["bar_index"] == 0]
+        a_zones = zones_by(zones, type="A", bar_index=0)
         assert len(a_zones) == 1
         assert a_zones[0]["fresh"] is False
 
@@ -414,12 +579,12 @@ class TestFreshness:
         zones = mark_freshness(zones, df)
 
         # Original demand zone should be unfresh
-        orig = [z for z in zones if z["bar_index"] == 0 and z["direction"] == "demand"]
+        orig = zones_by(zones, bar_index=0, direction="demand")
         assert len(orig) == 1
         assert orig[0]["fresh"] is False
 
         # New flipped supply zone should exist as FLIP type
-        flipped = [z for z in zones if z["type"] == "FLIP" and z["direction"] == "supply"]
+        flipped = zones_by(zones, type="FLIP", direction="supply")
         assert len(flipped) == 1
         assert flipped[0]["fresh"] is True
 
@@ -436,14 +601,26 @@ class TestFreshness:
         zones = find_zones(df, lookback=40)
         zones = mark_freshness(zones, df)
 
-        orig = [z for z in zones if z["bar_index"] == 0 and z["direction"] == "supply"]
+        orig = zones_by(zones, bar_index=0, direction="supply")
         assert len(orig) == 1
         assert orig[0]["fresh"] is False
 
-        flipped = [z for z in zones if z["type"] == "FLIP" and z["direction"] == "demand"]
+        flipped = zones_by(zones, type="FLIP", direction="demand")
         assert len(flipped) == 1
         assert flipped[0]["fresh"] is True
 
+    def test_detectors_see_in_place_edits(self):
+        """Detectors keep no per-frame state: an edit at the same length shows up."""
+        ohlc = OHLC.from_rows(_make_up(12, 1.0, 0.002))
+        before = get_fresh_zones(ohlc, "demand")
+        assert _get_scan(ohlc) is not _get_scan(ohlc)
+
+        ohlc.c[-3] = 0.9
+        assert get_fresh_zones(ohlc, "demand") != before
+        assert get_fresh_zones(ohlc, "demand") \
+            == get_fresh_zones(make_ohlc(np.column_stack([ohlc.o, ohlc.h, ohlc.l, ohlc.c])),
+                               "demand")
+
     def test_get_fresh_zones_flip_priority(self):
         """FLIP zones should sort before regular zones."""
         data = [
@@ -460,8 +637,7 @@ class TestFreshness:
         df = make_ohlc(data)
         demand = get_fresh_zones(df, "demand")
         # If a FLIP zone exists and is fresh, it should be first
-        flip_zones = [z for z in demand if z["type"] == "FLIP"]
-        if flip_zones and demand:
+        if any(z["type"] == "FLIP" for z in demand):
             assert demand[0]["type"] == "FLIP"
 
 
@@ -472,20 +648,19 @@ class TestAnalyzeArrival:
     def test_compression_arrival_passes(self):
         """Small-body candles approaching zone = compression = safe."""
         # Create 50 candles with avg body ~0.005
-        data = [(1.0, 1.01, 0.99, 1.005)] * 50
-        df = make_ohlc(data)
+        df = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.005), 50))
         assert analyze_arrival(df, 1.005, "demand") is True
 
     def test_momentum_arrival_fails(self):
         """Large bearish Marubozu approaching demand zone = adverse momentum."""
         # 50 small candles, avg body ~0.005
-        data = [(1.0, 1.01, 0.99, 1.005)] * 47
         # Then 3 candles, one with BEARISH body = 0.03 > 2.5 * 0.005
         # (bearish into demand = adverse momentum)
-        data += [(1.03, 1.035, 0.99, 1.0)]  # bearish Marubozu body=0.03
-        data += [(1.0, 1.01, 0.99, 1.005)]
-        data += [(1.005, 1.01, 0.99, 1.002)]
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([_flat_base((1.0, 1.01, 0.99, 1.005), 47), _rows(
+            1.03, 1.035, 0.99, 1.0,      # bearish Marubozu body=0.03
+            1.0, 1.01, 0.99, 1.005,
+            1.005, 1.01, 0.99, 1.002,
+        )]))
         assert analyze_arrival(df, 1.002, "demand") is False
 
     def test_insufficient_data_passes(self):
@@ -495,27 +670,26 @@ class TestAnalyzeArrival:
 
     def test_flat_market_passes(self):
         """Doji candles (open==close) = no momentum."""
-        data = [(1.0, 1.01, 0.99, 1.0)] * 50
-        df = make_ohlc(data)
+        df = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 50))
         assert analyze_arrival(df, 1.0, "demand") is True
 
     def test_just_under_threshold_passes(self):
         """Body just under 2.5x avg should NOT invalidate."""
-        data = [(1.0, 1.015, 0.99, 1.01)] * 47
-        data += [(1.0, 1.025, 0.99, 1.02)]  # body=0.02 < 2.5 * ~0.01
-        data += [(1.02, 1.025, 1.015, 1.022)]
-        data += [(1.022, 1.025, 1.02, 1.023)]
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([_flat_base((1.0, 1.015, 0.99, 1.01), 47), _rows(
+            1.0, 1.025, 0.99, 1.02,      # body=0.02 < 2.5 * ~0.01
+            1.02, 1.025, 1.015, 1.022,
+            1.022, 1.025, 1.02, 1.023,
+        )]))
         assert analyze_arrival(df, 1.023, "demand") is True
 
     def test_favorable_momentum_passes(self):
         """Large BULLISH candle approaching demand zone = favorable, not blocked."""
-        data = [(1.0, 1.01, 0.99, 1.005)] * 47
         # Bullish Marubozu approaching demand = displacement, not adverse
-        data += [(1.0, 1.035, 0.99, 1.03)]  # bullish body=0.03
-        data += [(1.03, 1.04, 1.02, 1.035)]
-        data += [(1.035, 1.04, 1.03, 1.038)]
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([_flat_base((1.0, 1.01, 0.99, 1.005), 47), _rows(
+            1.0, 1.035, 0.99, 1.03,      # bullish body=0.03
+            1.03, 1.04, 1.02, 1.035,
+            1.035, 1.04, 1.03, 1.038,
+        )]))
         assert analyze_arrival(df, 1.038, "demand") is True
 
 
@@ -569,29 +743,28 @@ class TestCheckRoadblocks:
 class TestStoryline:
     def test_bullish_rejection_confirmed(self):
         """HTF rejection off demand zone + LTF bullish BOS → confirmed BULL."""
-        htf_data = [
-            (1.05, 1.06, 1.04, 1.04),   # bearish
-            (1.045, 1.06, 1.03, 1.055),  # bullish → V-level demand
-            (1.06, 1.07, 1.05, 1.065),
-            (1.07, 1.08, 1.06, 1.075),
-            (1.08, 1.09, 1.07, 1.085),
-            (1.09, 1.10, 1.08, 1.095),
-            (1.10, 1.11, 1.09, 1.105),
-            (1.11, 1.12, 1.10, 1.115),
-            (1.12, 1.13, 1.11, 1.125),
+        htf_data = _rows(
+            1.05, 1.06, 1.04, 1.04,      # bearish
+            1.045, 1.06, 1.03, 1.055,    # bullish → V-level demand
+            1.06, 1.07, 1.05, 1.065,
+            1.07, 1.08, 1.06, 1.075,
+            1.08, 1.09, 1.07, 1.085,
+            1.09, 1.10, 1.08, 1.095,
+            1.10, 1.11, 1.09, 1.105,
+            1.11, 1.12, 1.10, 1.115,
+            1.12, 1.13, 1.11, 1.125,
             # Rejection candle: wick dips into demand, body stays above
-            (1.06, 1.07, 1.039, 1.065),
-        ]
+            1.06, 1.07, 1.039, 1.065,
+        )
         df_h = make_ohlc(htf_data)
 
-        ltf_base = [(1.04, 1.05, 1.03, 1.045)] * 20
-        ltf_base += [
-            (1.045, 1.06, 1.04, 1.055),
-            (1.055, 1.07, 1.05, 1.065),
-            (1.065, 1.08, 1.06, 1.075),
-            (1.075, 1.09, 1.07, 1.085),
-            (1.085, 1.10, 1.08, 1.095),
-        ]
+        ltf_base = np.vstack([_flat_base((1.04, 1.05, 1.03, 1.045)), _rows(
+            1.045, 1.06, 1.04, 1.055,
+            1.055, 1.07, 1.05, 1.065,
+            1.065, 1.08, 1.06, 1.075,
+            1.075, 1.09, 1.07, 1.085,
+            1.085, 1.10, 1.08, 1.095,
+        )])
         df_l = make_ohlc(ltf_base)
 
         result = detect_storyline(df_h, df_l)
@@ -600,19 +773,31 @@ class TestStoryline:
         assert "tp_target" in result
         assert "roadblock_near" in result
 
-    def test_no_fallback_to_momentum(self):
+        # The HTF half is cached on the candles' values; callers get their own zone
+        ctx = _htf_context(df_h)
+        assert _htf_context(OHLC.from_rows(htf_data)) is ctx
+        again = detect_storyline(df_h, df_l, htf_context=ctx)
+        assert again == result
+        assert again["htf_zone"] is not result["htf_zone"]
+
+    def test_htf_context_follows_in_place_edits(self):
+        df_h = OHLC.from_rows(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        assert not _htf_context(df_h).fresh
+        df_h.o[23], df_h.c[23] = 0.995, 1.005  # bullish bar after a flat one → V-level
+        assert _htf_context(df_h).fresh
+
+    def test_no_fallback_to_momentum(self, ltf_up_30):
         """When no HTF rejection found, should return None (no momentum fallback)."""
-        flat = [(1.0, 1.01, 0.99, 1.0)] * 24
-        flat.append((1.0, 1.05, 0.99, 1.04))
-        df_h = make_ohlc(flat)
-        df_l = make_trending_data("up", bars=30, start=1.0, step=0.001)
+        df_h = make_ohlc(np.vstack([_flat_base((1.0, 1.01, 0.99, 1.0), 24),
+                                    _rows(1.0, 1.05, 0.99, 1.04)]))
+        df_l = ltf_up_30
         result = detect_storyline(df_h, df_l)
         # Momentum fallback removed — no HTF structure = no signal
         assert result is None
 
-    def test_insufficient_data(self):
-        df_h = make_ohlc([(1.0, 1.1, 0.9, 1.0)] * 5)
-        df_l = make_ohlc([(1.0, 1.1, 0.9, 1.0)] * 10)
+    def test_insufficient_data(self, flat_10):
+        df_h = make_ohlc(_flat_base((1.0, 1.1, 0.9, 1.0), 5))
+        df_l = flat_10
         assert detect_storyline(df_h, df_l) is None
 
     def test_opposing_zone_tp_bull(self):
@@ -657,6 +842,56 @@ class TestStoryline:
         ]
         assert _check_roadblock(zones, "BULL", 1.05, 1.15) is False
 
+    def test_analyze_opposing_tp_and_roadblock(self):
+        """One scan returns the nearest opposing level and the roadblock flag."""
+        zones = [
+            {"direction": "supply", "top": 1.07, "bottom": 1.06, "fresh": True},
+            {"direction": "supply", "top": 1.20, "bottom": 1.19, "fresh": True},
+            {"direction": "demand", "top": 0.95, "bottom": 0.94, "fresh": True},
+        ]
+        tp, roadblock = analyze_opposing(zones, "BULL", 1.05, 1.30, tp_hint=1.15)
+        assert tp == 1.06
+        assert roadblock is True
+
+    def test_analyze_opposing_no_zones(self):
+        """No opposing zone → fallback TP and no roadblock."""
+        tp, roadblock = analyze_opposing([], "BEAR", 1.00, None)
+        assert tp is None
+        assert roadblock is False
+
+    def test_zone_index_nearest_levels(self):
+        """Presorted index finds the nearest level strictly beyond the price."""
+        zones = [
+            {"direction": "supply", "top": 1.20, "bottom": 1.19, "fresh": True},
+            {"direction": "supply", "top": 1.07, "bottom": 1.06, "fresh": True},
+            {"direction": "demand", "top": 0.95, "bottom": 0.94, "fresh": True},
+            {"direction": "demand", "top": 1.00, "bottom": 0.99, "fresh": True},
+        ]
+        index = ZoneIndex.from_zones(zones)
+        assert index.nearest_above(1.05) == 1.06
+        assert index.nearest_above(1.06) == 1.19
+        assert index.nearest_above(1.19) is None
+        assert index.nearest_below(1.00) == 0.95
+        assert index.nearest_below(0.95) is None
+        assert analyze_opposing(index, "BULL", 1.05, 1.30) \
+            == analyze_opposing(zones, "BULL", 1.05, 1.30)
+
+    def test_zone_index_from_table_uses_fresh_rows(self):
+        """A Zones table indexes only its fresh rows, sorted per side."""
+        zones = [
+            {"type": "A", "direction": "supply", "top": 1.20, "bottom": 1.19,
+             "bar_index": 0, "fresh": True},
+            {"type": "A", "direction": "supply", "top": 1.07, "bottom": 1.06,
+             "bar_index": 1, "fresh": False},
+            {"type": "V", "direction": "demand", "top": 1.00, "bottom": 0.99,
+             "bar_index": 2, "fresh": True},
+        ]
+        table = Zones.from_list(zones)
+        assert table.sorted_opposing("supply").tolist() == [1.19]
+        assert table.sorted_opposing("demand").tolist() == [1.00]
+        assert check_roadblocks(1.05, "BUY", table, 0.05) \
+            == check_roadblocks(1.05, "BUY", [zones[0], zones[2]], 0.05)
+
 
 # =====================
 # ENGULFING TESTS
@@ -721,56 +956,68 @@ class TestEngulfing:
 class TestInducement:
     def test_buy_side_sweep_returns_dict(self):
         """Wick below swing low + body closes above = inducement swept dict."""
-        data = [(1.0, 1.05, 0.95, 1.02)] * 10
-        data += [(1.0, 1.03, 0.94, 1.01)]  # sweep wick to 0.94
-        data += [(1.01, 1.05, 0.98, 1.04)] * 4
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([
+            _flat_base((1.0, 1.05, 0.95, 1.02), 10),
+            _rows(1.0, 1.03, 0.94, 1.01),  # sweep wick to 0.94
+            _flat_base((1.01, 1.05, 0.98, 1.04), 4),
+        ]))
         result = detect_inducement_swept(df, 1.05, 0.95, "BUY")
         assert result["swept"] is True
-        assert result["wick_level"] == pytest.approx(0.94)
+        assert result["wick_level"] == 0.94
 
     def test_sell_side_sweep_returns_dict(self):
         """Wick above swing high + body closes below = inducement swept dict."""
-        data = [(1.0, 1.05, 0.95, 0.98)] * 10
-        data += [(1.0, 1.06, 0.96, 0.99)]  # sweep wick to 1.06
-        data += [(0.99, 1.04, 0.93, 0.95)] * 4
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([
+            _flat_base((1.0, 1.05, 0.95, 0.98), 10),
+            _rows(1.0, 1.06, 0.96, 0.99),  # sweep wick to 1.06
+            _flat_base((0.99, 1.04, 0.93, 0.95), 4),
+        ]))
         result = detect_inducement_swept(df, 1.05, 0.95, "SELL")
         assert result["swept"] is True
-        assert result["wick_level"] == pytest.approx(1.06)
+        assert result["wick_level"] == 1.06
 
     def test_no_sweep_returns_dict(self):
         """No wick beyond swing points = no inducement."""
-        data = [(1.0, 1.04, 0.96, 1.02)] * 20
-        df = make_ohlc(data)
+        df = make_ohlc(_flat_base((1.0, 1.04, 0.96, 1.02), 20))
         result = detect_inducement_swept(df, 1.05, 0.95, "BUY")
         assert result["swept"] is False
         assert result["wick_level"] is None
 
     def test_insufficient_data(self):
-        df = make_ohlc([(1.0, 1.1, 0.9, 1.0)] * 3)
+        df = make_ohlc(_flat_base((1.0, 1.1, 0.9, 1.0), 3))
         result = detect_inducement_swept(df, 1.1, 0.9, "BUY")
         assert result["swept"] is False
 
+    def test_zero_lookback_scans_no_bars(self):
+        df = make_ohlc(np.vstack([
+            _flat_base((1.0, 1.05, 0.95, 1.02), 10),
+            _rows(1.0, 1.03, 0.94, 1.01),  # sweep wick to 0.94
+        ]))
+        assert detect_inducement_swept(df, 1.05, 0.95, "BUY", lookback=1)["swept"] is True
+        result = detect_inducement_swept(df, 1.05, 0.95, "BUY", lookback=0)
+        assert result == {"swept": False, "wick_level": None}
+
     def test_wick_and_body_both_below_not_inducement(self):
         """If body also closes below swing low, it's a real break not a sweep."""
-        data = [(1.0, 1.05, 0.95, 1.02)] * 10
-        data += [(0.96, 0.97, 0.92, 0.93)]  # body below 0.95 too
-        data += [(0.93, 0.96, 0.91, 0.95)] * 4
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([
+            _flat_base((1.0, 1.05, 0.95, 1.02), 10),
+            _rows(0.96, 0.97, 0.92, 0.93),  # body below 0.95 too
+            _flat_base((0.93, 0.96, 0.91, 0.95), 4),
+        ]))
         result = detect_inducement_swept(df, 1.05, 0.95, "BUY")
         assert result["swept"] is False
 
     def test_deepest_wick_tracked(self):
         """Multiple sweeps: the deepest wick should be returned."""
-        data = [(1.0, 1.05, 0.95, 1.02)] * 10
-        data += [(1.0, 1.03, 0.94, 1.01)]   # sweep 1, wick=0.94
-        data += [(1.01, 1.04, 0.93, 1.02)]  # sweep 2, wick=0.93 (deeper)
-        data += [(1.02, 1.05, 0.97, 1.04)] * 3
-        df = make_ohlc(data)
+        df = make_ohlc(np.vstack([
+            _flat_base((1.0, 1.05, 0.95, 1.02), 10),
+            _rows(1.0, 1.03, 0.94, 1.01,     # sweep 1, wick=0.94
+                  1.01, 1.04, 0.93, 1.02),   # sweep 2, wick=0.93 (deeper)
+            _flat_base((1.02, 1.05, 0.97, 1.04), 3),
+        ]))
         result = detect_inducement_swept(df, 1.05, 0.95, "BUY")
         assert result["swept"] is True
-        assert result["wick_level"] == pytest.approx(0.93)
+        assert result["wick_level"] == 0.93
 
 
 # =====================
@@ -802,31 +1049,142 @@ class TestComputeConfidence:
 # FULL SIGNAL GENERATION TESTS — SNIPER PROTOCOL
 # =====================
 class TestGetSMCSignal:
-    def test_returns_none_empty_df(self):
-        assert get_smc_signal(pd.DataFrame(), pd.DataFrame(), "EURUSD") is None
-
-    def test_returns_none_insufficient_lower_tf(self):
-        df_l = make_ohlc([(1.0, 1.1, 0.9, 1.0)] * 10)
-        df_h = make_trending_data("up", bars=25)
+    @pytest.mark.parametrize("ltf, htf", [
+        ("empty_frame", "empty_frame"),
+        ("flat_10", "htf_up_25"),      # insufficient lower TF
+        ("ltf_up_30", "flat_10"),      # insufficient higher TF
+    ])
+    def test_returns_none_insufficient_data(self, request, ltf, htf):
+        df_l = request.getfixturevalue(ltf)
+        df_h = request.getfixturevalue(htf)
         assert get_smc_signal(df_l, df_h, "EURUSD") is None
 
-    def test_returns_none_insufficient_higher_tf(self):
-        df_l = make_trending_data("up", bars=30)
-        df_h = make_ohlc([(1.0, 1.1, 0.9, 1.0)] * 10)
-        assert get_smc_signal(df_l, df_h, "EURUSD") is None
-
-    def test_signal_has_sniper_fields(self):
+    def test_results_memoized_on_frame_values(self, ltf_up_30):
+        """Equal OHLC values hit one cache entry; other settings get their own."""
+        df_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        assert get_smc_signal(ltf_up_30, df_h, "EURUSD") is None
+        assert len(_signal_cache) == 1
+        assert get_smc_signal(ltf_up_30.copy(), df_h.copy(), "EURUSD") is None
+        assert len(_signal_cache) == 1
+        get_smc_signal(ltf_up_30, df_h, "EURUSD", risk_pips=20)
+        assert len(_signal_cache) == 2
+
+    def test_cached_signal_is_copied_per_call(self, buy_setup_ltf, htf_uptrend):
+        """A cache hit skips the pipeline and returns an equal, separate dict."""
+        sig = {"act": "BUY", "market_e": 1.05, "market_sl": 1.04}
+        with patch("strategy._smc_signal", return_value=sig) as body:
+            first = get_smc_signal(buy_setup_ltf, htf_uptrend, "EURUSD")
+            second = get_smc_signal(buy_setup_ltf, htf_uptrend, "EURUSD")
+            assert body.call_count == 1
+            assert first == second == sig
+            assert first is not second and first is not sig
+            first["act"] = "SELL"  # callers may edit their copy
+            assert get_smc_signal(buy_setup_ltf, htf_uptrend, "EURUSD") == sig
+
+            get_smc_signal(buy_setup_ltf, htf_uptrend, "EURUSD", memo=False)
+            assert body.call_count == 2
+            assert len(_signal_cache) == 1
+
+    def test_signal_cache_bounded_by_size(self):
+        lru = _SizedLRU(max_bytes=4096)
+        for i in range(100):
+            lru.put((i, b"\0" * 16), {"act": "BUY", "tp": float(i)})
+        assert lru.nbytes <= 4096
+        assert 1 < len(lru) < 100
+        assert (99, b"\0" * 16) in lru and (0, b"\0" * 16) not in lru
+
+    def test_results_persisted_to_cache_dir(self, ltf_up_30):
+        """With disk_cache and SIGNAL_CACHE_DIR set, a fresh process reads from disk."""
+        df_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        sig = {"act": "BUY", "market_e": 1.0}
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch("strategy.SIGNAL_CACHE_DIR", cache_dir):
+            with patch("strategy._smc_signal", return_value=sig) as body:
+                assert get_smc_signal(ltf_up_30, df_h, "EURUSD", disk_cache=True) == sig
+            assert body.call_count == 1
+            assert len(os.listdir(cache_dir)) == 1
+
+            _signal_cache.clear()  # a fresh process: only the disk has it
+            with patch("strategy._smc_signal", return_value=None) as body:
+                assert get_smc_signal(ltf_up_30, df_h, "EURUSD", disk_cache=True) == sig
+                get_smc_signal(ltf_up_30, df_h, "EURUSD", risk_pips=20,
+                               disk_cache=True)
+            assert body.call_count == 1  # only the new settings were computed
+
+            for name in os.listdir(cache_dir):  # truncated files are recomputed
+                open(os.path.join(cache_dir, name), "wb").close()
+            _signal_cache.clear()
+            with patch("strategy._smc_signal", return_value=sig) as body:
+                assert get_smc_signal(ltf_up_30, df_h, "EURUSD", disk_cache=True) == sig
+            assert body.call_count == 1
+
+    def test_cache_dir_unused_by_default(self, ltf_up_30):
+        """Scanner calls (no disk_cache) never write to SIGNAL_CACHE_DIR."""
+        df_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch("strategy.SIGNAL_CACHE_DIR", cache_dir):
+            with patch("strategy._smc_signal", return_value=None):
+                get_smc_signal(ltf_up_30, df_h, "EURUSD")
+                get_smc_signal(ltf_up_30, df_h, "EURUSD", memo=False)
+            assert os.listdir(cache_dir) == []
+
+    def test_shared_cache_dir_is_not_used(self, ltf_up_30):
+        """A cache directory other users can write to is never unpickled from."""
+        df_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch("strategy.SIGNAL_CACHE_DIR", cache_dir):
+            os.chmod(cache_dir, 0o777)
+            assert get_smc_signal(ltf_up_30, df_h, "EURUSD", disk_cache=True) is None
+            assert os.listdir(cache_dir) == []
+
+    @pytest.mark.parametrize("sub", ["", "nested"])
+    def test_unusable_cache_dir_falls_back(self, ltf_up_30, sub):
+        """A cache path that is a file (or below one) disables the disk cache."""
+        df_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        sig = {"act": "BUY", "market_e": 1.0}
+        with tempfile.NamedTemporaryFile() as blocker, \
+                patch("strategy.SIGNAL_CACHE_DIR", os.path.join(blocker.name, sub)), \
+                patch("strategy._smc_signal", return_value=sig):
+            assert get_smc_signal(ltf_up_30, df_h, "EURUSD", memo=False,
+                                  disk_cache=True) == sig
+
+    def test_failed_cache_write_leaves_no_temp_file(self, ltf_up_30):
+        df_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        sig = {"act": "BUY", "market_e": 1.0}
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch("strategy.SIGNAL_CACHE_DIR", cache_dir), \
+                patch("strategy._smc_signal", return_value=sig), \
+                patch("strategy.pickle.dump", side_effect=OSError("disk full")):
+            assert get_smc_signal(ltf_up_30, df_h, "EURUSD", memo=False,
+                                  disk_cache=True) == sig
+            assert os.listdir(cache_dir) == []
+
+    def test_raw_arrays_share_frame_results(self, ltf_up_30, htf_uptrend):
+        """Bare columns are the same candles as the frame: same cache entry."""
+        sig = {"act": "BUY", "market_e": 1.03}
+        with patch("strategy._smc_signal", return_value=sig) as body:
+            raw = get_smc_signal_raw(*_columns(ltf_up_30), *_columns(htf_uptrend),
+                                     "EURUSD")
+            assert get_smc_signal(ltf_up_30, htf_uptrend, "EURUSD") == raw == sig
+            assert body.call_count == 1
+            assert len(_signal_cache) == 1
+            data = _columns(ltf_up_30)[:, :10]  # too short: never reaches the pipeline
+            assert get_smc_signal_raw(*data, *_columns(htf_uptrend), "EURUSD") is None
+            assert body.call_count == 1
+
+    def test_signal_fn_is_bound_per_pair(self, flat_10, ltf_up_30):
+        """get_signal_fn() reuses one bound function per pair and settings."""
+        fn = get_signal_fn("EURUSD", 50)
+        assert get_signal_fn("EURUSD", 50) is fn
+        assert get_signal_fn("XAUUSD", 50) is not fn
+        df_l = ltf_up_30
+        df_h = flat_10
+        assert fn(df_l, df_h) is None
+
+    def test_signal_has_sniper_fields(self, buy_setup_ltf, htf_uptrend):
         """Any signal produced must have sweep and arrival fields."""
-        df_h = make_trending_data("up", bars=25, start=1.0, step=0.002)
-        base_data = [(1.0, 1.02, 0.98, 1.01)] * 20
-        base_data += [
-            (1.01, 1.035, 1.005, 1.03),
-            (1.03, 1.04, 1.025, 1.035),
-            (1.035, 1.045, 1.03, 1.04),
-            (1.04, 1.05, 1.035, 1.045),
-            (1.045, 1.06, 1.046, 1.055),
-        ]
-        df_l = make_ohlc(base_data)
+        df_h = htf_uptrend
+        df_l = buy_setup_ltf
         sig = get_smc_signal(df_l, df_h, "EURUSD")
         if sig is not None:
             assert "sweep" in sig
@@ -834,21 +1192,19 @@ class TestGetSMCSignal:
             assert sig["arrival"] == "compression"
             assert sig["confidence"] in ("high", "medium", "low")
 
-    def test_no_signal_no_fresh_zone(self):
+    def test_no_signal_no_fresh_zone(self, htf_up_25):
         """Sniper protocol: no fresh zone = no trade."""
         # All same candles, no zone formation
-        data = [(1.0, 1.05, 0.95, 1.0)] * 25
-        df_l = make_ohlc(data)
-        df_h = make_trending_data("up", bars=25)
+        df_l = make_ohlc(_flat_base((1.0, 1.05, 0.95, 1.0), 25))
+        df_h = htf_up_25
         sig = get_smc_signal(df_l, df_h, "EURUSD")
         # Should return None (no zones formed from flat data)
         assert sig is None
 
-    def test_no_signal_conflicting_bias(self):
+    def test_no_signal_conflicting_bias(self, flat_102_98, htf_down_25):
         """Bearish HTF with bullish LTF should not signal BUY."""
-        df_h = make_trending_data("down", bars=25)
-        data = [(1.0, 1.02, 0.98, 1.01)] * 20
-        data += [(1.01, 1.04, 1.005, 1.03)] * 5
+        df_h = htf_down_25
+        data = np.vstack([flat_102_98, _flat_base((1.01, 1.04, 1.005, 1.03), 5)])
         df_l = make_ohlc(data)
         sig = get_smc_signal(df_l, df_h, "EURUSD")
         if sig is not None:
@@ -857,39 +1213,53 @@ class TestGetSMCSignal:
     def test_custom_risk_pips(self):
         """Risk pips parameter should affect SL distance."""
         df_h = make_trending_data("up", bars=25, start=1.0, step=0.005)
-        data = [(1.0, 1.10, 0.80, 1.05)] * 20
-        data += [
-            (1.05, 1.15, 1.04, 1.12),
-            (1.12, 1.16, 1.10, 1.14),
-            (1.14, 1.18, 1.12, 1.16),
-            (1.16, 1.20, 1.15, 1.18),
-            (1.18, 1.22, 1.19, 1.21),
-        ]
-        df_l = make_ohlc(data)
-
-        sig_30 = get_smc_signal(df_l, df_h, "EURUSD", risk_pips=30)
-        sig_100 = get_smc_signal(df_l, df_h, "EURUSD", risk_pips=100)
+        data = np.vstack([_flat_base((1.0, 1.10, 0.80, 1.05)), _rows(
+            1.05, 1.15, 1.04, 1.12,
+            1.12, 1.16, 1.10, 1.14,
+            1.14, 1.18, 1.12, 1.16,
+            1.16, 1.20, 1.15, 1.18,
+            1.18, 1.22, 1.19, 1.21,
+        )])
+        ltf, htf = _columns(data), _columns(df_h)
+
+        sig_30 = get_smc_signal_raw(*ltf, *htf, "EURUSD", risk_pips=30)
+        sig_100 = get_smc_signal_raw(*ltf, *htf, "EURUSD", risk_pips=100)
 
         if sig_30 and sig_100:
             risk_30 = abs(sig_30["market_e"] - sig_30["market_sl"])
             risk_100 = abs(sig_100["market_e"] - sig_100["market_sl"])
             assert risk_30 <= risk_100
 
-    def test_momentum_arrival_blocks_signal(self):
+    def test_risk_sweep_runs_layers_once(self, buy_setup_ltf, htf_uptrend):
+        """get_smc_signals() prices one setup per risk_pips, matching single calls."""
+        setup = _SignalSetup("BUY", 1.05, 1.06, 1.03, 1.10, 1.12, 1.0,
+                             {"confidence": "high"})
+        risks = [10, 30, 100, 300]
+        with patch("strategy._smc_setup", return_value=setup) as layers:
+            sweep = get_smc_signals(buy_setup_ltf, htf_uptrend, "EURUSD", risks)
+            assert layers.call_count == 1
+            assert sweep == [get_smc_signal(buy_setup_ltf, htf_uptrend, "EURUSD",
+                                            risk_pips=r, memo=False) for r in risks]
+        sl_distances = [s["limit_e"] - s["limit_sl"] for s in sweep]
+        assert sl_distances == sorted(sl_distances)
+        assert sl_distances[-1] == pytest.approx(0.02)  # anchor reached: no cap
+
+        with patch("strategy._smc_setup", return_value=None):
+            assert get_smc_signals(buy_setup_ltf, htf_uptrend, "EURUSD", risks) == [None] * 4
+
+    def test_momentum_arrival_blocks_signal(self, htf_uptrend):
         """If last candles are Marubozu, arrival physics should block."""
-        df_h = make_trending_data("up", bars=25, start=1.0, step=0.002)
+        df_h = htf_uptrend
         # 20 small candles
-        base = [(1.0, 1.005, 0.995, 1.002)] * 20
         # Then massive momentum candles (body >> 2.5x avg)
-        base += [
-            (1.002, 1.05, 1.00, 1.04),   # huge body
-            (1.04, 1.08, 1.03, 1.07),     # huge body
-            (1.07, 1.10, 1.06, 1.09),     # huge body
-            (1.09, 1.12, 1.08, 1.11),
-            (1.11, 1.14, 1.10, 1.13),
-        ]
-        df_l = make_ohlc(base)
-        sig = get_smc_signal(df_l, df_h, "EURUSD")
+        base = np.vstack([_flat_base((1.0, 1.005, 0.995, 1.002)), _rows(
+            1.002, 1.05, 1.00, 1.04,     # huge body
+            1.04, 1.08, 1.03, 1.07,      # huge body
+            1.07, 1.10, 1.06, 1.09,      # huge body
+            1.09, 1.12, 1.08, 1.11,
+            1.11, 1.14, 1.10, 1.13,
+        )])
+        sig = get_smc_signal_raw(*_columns(base), *_columns(df_h), "EURUSD")
         # Likely None due to momentum invalidation
         # (may also be None for other reasons, which is fine)
         assert sig is None or sig["arrival"] == "compression"
@@ -902,23 +1272,39 @@ class TestGetSMCSignal:
         assert _compute_confidence(True, 1, zone, False) == "high"
         assert _compute_confidence(False, 1, zone, False) == "medium"
 
-    def test_touch_trade_field_present(self):
+    def test_touch_trade_field_present(self, buy_setup_ltf, htf_uptrend):
         """Any signal produced must have the 'touch' field."""
-        df_h = make_trending_data("up", bars=25, start=1.0, step=0.002)
-        base_data = [(1.0, 1.02, 0.98, 1.01)] * 20
-        base_data += [
-            (1.01, 1.035, 1.005, 1.03),
-            (1.03, 1.04, 1.025, 1.035),
-            (1.035, 1.045, 1.03, 1.04),
-            (1.04, 1.05, 1.035, 1.045),
-            (1.045, 1.06, 1.046, 1.055),
-        ]
-        df_l = make_ohlc(base_data)
+        df_h = htf_uptrend
+        df_l = buy_setup_ltf
         sig = get_smc_signal(df_l, df_h, "EURUSD", touch_trade=True)
         if sig is not None:
             assert "touch" in sig
             assert isinstance(sig["touch"], bool)
 
+    def test_batch_matches_single_calls(self, flat_10, ltf_up_30, htf_uptrend):
+        """The process pool returns what one-by-one calls return, in order."""
+        flat_h = make_ohlc(_flat_base((1.0, 1.01, 0.99, 1.0), 25))
+        chop = np.vstack([_flat_base((1.0, 1.001, 0.999, 1.0005), 30)]
+                         + [_rows(1.0, 1.035, 0.965, 1.03, 1.03, 1.035, 0.965, 1.0)] * 4)
+        df_ls = [flat_10, ltf_up_30, make_ohlc(chop)]
+        df_hs = [htf_uptrend, flat_h, htf_uptrend]
+        pairs = ["EURUSD", "BTCUSDT", "EURUSD"]  # short LTF / no HTF zones / volatile
+        expected = [get_smc_signal(df_l, df_h, pair, memo=False)
+                    for df_l, df_h, pair in zip(df_ls, df_hs, pairs)]
+        assert get_smc_signals_batch(df_ls, df_hs, pairs, max_workers=2) == expected
+
+    def test_batch_keeps_pair_order(self, ltf_up_30, htf_uptrend):
+        pairs = ["EURUSD", "XAUUSD", "BTCUSDT"]
+        with patch("strategy._smc_signal",
+                   side_effect=lambda df_l, df_h, pair, *_: {"pair": pair}):
+            sigs = get_smc_signals_batch([ltf_up_30] * 3, [htf_uptrend] * 3, pairs,
+                                         max_workers=1)
+        assert sigs == [{"pair": pair} for pair in pairs]
+
+    def test_batch_rejects_mismatched_inputs(self, ltf_up_30, htf_uptrend):
+        with pytest.raises(ValueError):
+            get_smc_signals_batch([ltf_up_30] * 2, [htf_uptrend], ["EURUSD", "XAUUSD"])
+
 
 class TestTouchTrade:
     def test_confidence_touch_tier(self):
@@ -937,11 +1323,10 @@ class TestTouchTrade:
         assert _compute_confidence(True, 1, zone, False, touch_entry=True) == "high"
         assert _compute_confidence(False, 1, zone, False, touch_entry=True) == "medium"
 
-    def test_touch_off_requires_engulfing(self):
+    def test_touch_off_requires_engulfing(self, htf_uptrend):
         """touch_trade=False should still require engulfing."""
-        df_h = make_trending_data("up", bars=25, start=1.0, step=0.002)
-        base = [(1.0, 1.02, 0.98, 1.01)] * 25
-        df_l = make_ohlc(base)
+        df_h = htf_uptrend
+        df_l = make_ohlc(_flat_base((1.0, 1.02, 0.98, 1.01), 25))
         sig = get_smc_signal(df_l, df_h, "EURUSD", touch_trade=False)
         # Should be None — flat data, no engulfing possible
         assert sig is None
@@ -996,18 +1381,10 @@ class TestMultiTP:
         # 1:3 RR would be 1.10 + 0.02*3 = 1.16, HTF extreme 1.50 is higher
         assert levels["tp3"] == 1.50
 
-    def test_signal_has_tp_fields(self):
+    def test_signal_has_tp_fields(self, buy_setup_ltf, htf_uptrend):
         """Any signal produced must have tp1, tp2, tp3 fields."""
-        df_h = make_trending_data("up", bars=25, start=1.0, step=0.002)
-        base_data = [(1.0, 1.02, 0.98, 1.01)] * 20
-        base_data += [
-            (1.01, 1.035, 1.005, 1.03),
-            (1.03, 1.04, 1.025, 1.035),
-            (1.035, 1.045, 1.03, 1.04),
-            (1.04, 1.05, 1.035, 1.045),
-            (1.045, 1.06, 1.046, 1.055),
-        ]
-        df_l = make_ohlc(base_data)
+        df_h = htf_uptrend
+        df_l = buy_setup_ltf
         sig = get_smc_signal(df_l, df_h, "EURUSD")
         if sig is not None:
             assert "tp1" in sig